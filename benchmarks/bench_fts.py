@@ -0,0 +1,102 @@
+"""Time the full-text lookups (topic repeats and search) on a synthetic article history.
+
+    python benchmarks/bench_fts.py [--articles 100000] [--recommended 300] [--candidates 300] [--repeat 5]
+
+Builds a throwaway database with Zipf-distributed title and body words, so a
+few words are very common and most are rare, like real headlines.
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from reading_recs import db, rank
+from reading_recs.config import TOPIC_REPEAT_LOOKBACK_DAYS
+
+PROFILE = "bench"
+
+
+def _word(i: int) -> str:
+    """A distinct lowercase word per index; titles are tokenized on letters only."""
+    letters = ""
+    while True:
+        i, r = divmod(i, 26)
+        letters += chr(ord("a") + r)
+        if not i:
+            return "zq" + letters
+
+
+def _sentence(rng: np.random.Generator, vocab: list[str], n_words: int) -> str:
+    ranks = np.minimum(rng.zipf(1.3, n_words), len(vocab)) - 1
+    return " ".join(vocab[r] for r in ranks)
+
+
+def build_history(n_articles: int, n_recommended: int, rng: np.random.Generator):
+    """Fill the (temporary) database: older articles first, recommendations among the newest."""
+    vocab = [_word(i) for i in range(50_000)]
+    today = date.today()
+    conn = db.get_conn()
+    conn.executemany(
+        "INSERT INTO articles (url, title, source, text, embedding_score, llm_score, summary, recommended, run_date) "
+        "VALUES (?, ?, ?, ?, 0.0, ?, '', 0, ?)",
+        (
+            (f"https://example.com/{i}", _sentence(rng, vocab, 9), f"source-{i % 200}",
+             _sentence(rng, vocab, 200), float(rng.integers(1, 11)),
+             (today - timedelta(days=(n_articles - i) * 365 // n_articles)).isoformat())
+            for i in range(n_articles)
+        ),
+    )
+    recommended = random.Random(0).sample(range(n_articles - 2000, n_articles), n_recommended)
+    conn.executemany(
+        "INSERT INTO recommendations (profile, url, source, run_date) VALUES (?, ?, ?, ?)",
+        [(PROFILE, f"https://example.com/{i}", f"source-{i % 200}", today.isoformat()) for i in recommended],
+    )
+    conn.commit()
+    conn.close()
+    return vocab
+
+
+def _best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--recommended", type=int, default=300)
+    parser.add_argument("--candidates", type=int, default=300, help="titles whose terms form the topic-repeat query")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATA_DIR = Path(tmp)
+        db.DB_PATH = Path(tmp) / "bench.db"
+        db.init_db()
+
+        start = time.perf_counter()
+        vocab = build_history(args.articles, args.recommended, rng)
+        print(f"built {args.articles} articles in {time.perf_counter() - start:.1f} s")
+
+        words = set().union(*(rank.terms(_sentence(rng, vocab, 9)) for _ in range(args.candidates)))
+        matches = len(db.find_recent_recommended_matches(words, TOPIC_REPEAT_LOOKBACK_DAYS, PROFILE))
+        ms = _best_of(args.repeat, lambda: db.find_recent_recommended_matches(words, TOPIC_REPEAT_LOOKBACK_DAYS, PROFILE))
+        print(f"find_recent_recommended_matches: {ms:7.1f} ms ({len(words)} query terms, {matches} matches)")
+
+        for query in (vocab[0], vocab[50], f"{vocab[3]} {vocab[40]}", f'"{vocab[0]} {vocab[1]}"', f"{vocab[500]}*"):
+            found = len(db.search_articles(query))
+            ms = _best_of(args.repeat, lambda: db.search_articles(query))
+            print(f"search_articles {query!r:>20}: {ms:7.1f} ms ({found} results)")
+
+
+if __name__ == "__main__":
+    main()
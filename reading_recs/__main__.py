@@ -1,3 +1,80 @@
-from reading_recs.main import run
+import argparse
+import importlib
+import logging
+import sqlite3
+import sys
+import time
+from pathlib import Path
 
-run()
+from reading_recs import db, main
+from reading_recs.config import EXPORT_DIR
+from reading_recs.profiles import load_profiles
+
+log = logging.getLogger("reading_recs")
+
+parser = argparse.ArgumentParser(prog="reading_recs", description="Run the full pipeline, or a single stage.")
+parser.add_argument("--force-all", action="store_true", help="poll every feed, ignoring the adaptive schedule")
+parser.add_argument("--resume", action="store_true", help="continue the latest unfinished run from its last checkpoint")
+subparsers = parser.add_subparsers(dest="command")
+subparsers.add_parser("sync-feedback", help="pull feedback from Cloudflare KV and refresh the preference profile")
+subparsers.add_parser("fetch", help="start a new run by fetching articles from due feeds (see --force-all)")
+subparsers.add_parser("enrich", help="add popularity signals to the latest run's articles")
+subparsers.add_parser("score", help="score the latest run's articles and select the digests")
+subparsers.add_parser("send", help="push the latest run's digests to KV and email them")
+subparsers.add_parser("broken-feeds", help="list chronically failing feeds")
+search_parser = subparsers.add_parser("search", help="full-text search over stored articles")
+search_parser.add_argument("query", help='FTS5 query, e.g. "rust AND async" or "title:llm*"')
+search_parser.add_argument("--limit", type=int, default=20, help="maximum results (default 20)")
+export_parser = subparsers.add_parser("export", help="stream history to Parquet/Arrow files, incrementally since the last export")
+export_parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet", help="output format (default parquet)")
+export_parser.add_argument("--full", action="store_true", help="export all rows, ignoring the saved watermarks")
+export_parser.add_argument("--out", type=Path, default=EXPORT_DIR, help="output directory (default data/export)")
+args = parser.parse_args()
+
+if args.command in main.STAGE_MODULES:
+    start = time.perf_counter()
+    for module in main.STAGE_MODULES[args.command]:
+        importlib.import_module(module)
+    log.info("%s: imported stage modules in %.0f ms", args.command, (time.perf_counter() - start) * 1000)
+
+db.init_db()
+profiles = load_profiles()
+
+
+if args.command is None:
+    main.run(force_all=args.force_all, resume=args.resume)
+elif args.command == "sync-feedback":
+    main.sync_stage(profiles)
+elif args.command == "fetch":
+    main.fetch_stage(db.start_run(), profiles, force_all=args.force_all)
+elif args.command == "enrich":
+    main.enrich_stage(main.run_ready_for("enrich"))
+elif args.command == "score":
+    main.score_stage(main.run_ready_for("score"), profiles)
+elif args.command == "send":
+    main.send_stage(main.run_ready_for("send"), profiles)
+elif args.command == "broken-feeds":
+    from reading_recs.fetch import parse_feeds
+    from reading_recs.health import broken_feeds_report
+
+    for b in broken_feeds_report(parse_feeds()):
+        print(f"{b['title']} | {b['url']}  ({b['consecutive_failures']} failures, state {b['state']}: {b['last_error']})")
+elif args.command == "search":
+    try:
+        results = db.search_articles(args.query, args.limit)
+    except sqlite3.OperationalError as e:
+        sys.exit(f"Invalid search query: {e}")
+    for r in results:
+        print(f"{r['run_date']}  {r['llm_score'] or 0:4.1f}  {r['title']} | {r['source']}\n    {r['url']}\n    {r['snippet']}")
+elif args.command == "export":
+    try:
+        from reading_recs import export
+    except ModuleNotFoundError as e:
+        if e.name != "pyarrow":
+            raise
+        sys.exit('export requires pyarrow: pip install ".[export]"')
+    export.export(args.format, full=args.full, out_dir=args.out)
+
+# Only stages that made HTTP requests have loaded the transport
+if args.command is not None and "reading_recs.transport" in sys.modules:
+    sys.modules["reading_recs.transport"].log_stats()
@@ -18,6 +18,7 @@ DATA_DIR = ROOT_DIR / "data"
 DB_PATH = DATA_DIR / "reading_recs.db"
 FEEDS_PATH = ROOT_DIR / "feeds.txt"
 FAVORITES_PATH = ROOT_DIR / "examples" / "favorites.md"
+PROFILES_PATH = ROOT_DIR / "profiles.toml"  # optional; enables multi-reader mode
 
 # Pipeline constants
 FEED_LOOKBACK_DAYS = 7
@@ -29,8 +30,73 @@ SOURCE_PENALTY_PER_REC = 0.3    # score penalty per recent recommendation from t
 SOURCE_PENALTY_LOOKBACK_DAYS = 14  # window for counting recent recommendations
 MAX_ARTICLES_PER_SOURCE = 2  # maximum articles from one source in a single digest
 
+# Cascade scoring: cheap local pre-score decides LLM scoring order
+LLM_CALL_BUDGET = 300  # max LLM scoring calls per run
+LLM_TOKEN_BUDGET = 1_000_000  # max LLM scoring tokens (prompt + completion) per run
+CASCADE_TARGET_ARTICLES = MIN_ARTICLES  # stop once this many articles are confidently above threshold
+CASCADE_CONFIDENCE_MARGIN = 1.0  # score after every reader's re-rank penalties must clear LLM_SCORE_THRESHOLD by this much to count
+
+# Shadow scoring: compare an alternative scorer against production on a sample
+SHADOW_SAMPLE_RATE = float(os.environ.get("SHADOW_SAMPLE_RATE", "0"))  # fraction of scored articles; 0 disables
+SHADOW_MODEL = os.environ.get("SHADOW_MODEL", "gpt-4o-mini")
+SHADOW_EXCERPT_CHARS = 1000  # production sends 3000
+SHADOW_BATCH_SIZE = 5  # articles per shadow call
+
+# Per-profile re-ranking (multi-reader mode only)
+FEEDBACK_SOURCE_WEIGHT = 2.0  # max boost/penalty from a reader's votes on a source
+FAVORITES_SIMILARITY_WEIGHT = 5.0  # multiplied by cosine similarity to the reader's favorites
+
+# Ranking engine
+RANK_MMR_LAMBDA = 0.0  # diversity weight; 0 selects purely by adjusted score
+RANK_HASH_DIM = 1024  # width of hashed term vectors used for similarity
+
+# Topic-repeat demotion, using the full-text index over past articles
+TOPIC_REPEAT_PENALTY = 1.5  # score penalty for a candidate covering a recently recommended topic
+TOPIC_REPEAT_LOOKBACK_DAYS = 30  # window of past recommendations to compare against
+TOPIC_REPEAT_SIMILARITY = 0.35  # title word overlap (Jaccard) at which a candidate counts as a repeat
+
+ARTICLE_TEXT_MAX_CHARS = 5000  # text kept per article; scoring uses 3000, the DB stores 5000
+TEXT_SPILL_ENABLED = os.environ.get("TEXT_SPILL", "") == "1"  # write untruncated text to TEXT_SPILL_DIR
+TEXT_SPILL_DIR = DATA_DIR / "text"
+REPORT_MEMORY = os.environ.get("REPORT_MEMORY", "") == "1"  # log tracemalloc peak per pipeline stage
+RUN_HISTORY_KEEP = 30  # runs whose per-article checkpoints are kept; finished runs keep scores only
+
+# Shared HTTP transport
+HTTP_MAX_CONNECTIONS = 32  # pool size; must cover KV_SYNC_CONCURRENCY
+HTTP2_ENABLED = os.environ.get("HTTP2", "") == "1"  # needs the h2 package (pip install httpx[http2])
+DNS_CACHE_TTL = 300  # seconds
+
+# Download limits; bodies are streamed and reading stops at the cap
+MAX_PAGE_BYTES = 2_000_000
+MAX_FEED_BYTES = 5_000_000
+
+# Parsing of downloaded feeds/pages
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", os.cpu_count() or 1))  # 0 parses in-process (debugging)
+PARSE_BATCH_SIZE = 16  # jobs sent to a worker per round-trip
+
+# Adaptive feed polling
+SCHEDULE_MIN_INTERVAL_HOURS = 12  # feeds with frequent or undated posts are polled every run
+SCHEDULE_MAX_INTERVAL_HOURS = 72  # keeps max interval + run gap inside FEED_LOOKBACK_DAYS
+
+# Circuit breaker for failing feeds and full-text hosts
+CIRCUIT_FAILURE_THRESHOLD = 3  # consecutive failures before a feed/host is skipped
+CIRCUIT_BASE_COOLDOWN_HOURS = 24  # first cooldown; doubles with each further failure
+CIRCUIT_MAX_COOLDOWN_HOURS = 24 * 30
+CIRCUIT_CHRONIC_FAILURES = 6  # feeds failing this many times in a row are reported for pruning
+
 # Cloudflare (feedback system)
 CLOUDFLARE_API_TOKEN = os.environ.get("CLOUDFLARE_API_TOKEN", "")
 CLOUDFLARE_ACCOUNT_ID = os.environ.get("CLOUDFLARE_ACCOUNT_ID", "")
 CLOUDFLARE_KV_NAMESPACE_ID = os.environ.get("CLOUDFLARE_KV_NAMESPACE_ID", "")
 WORKER_BASE_URL = os.environ.get("WORKER_BASE_URL", "")
+KV_LIST_PAGE_SIZE = 1000  # Cloudflare's maximum keys per list request
+KV_SYNC_CONCURRENCY = 16  # parallel value reads during feedback sync
+
+# Preference profile
+PREFERENCE_FULL_REBUILD_EVERY = 10  # incremental updates between full rebuilds
+PREFERENCE_SAMPLE_SIZE = 200  # max ratings sent in a full rebuild
+PREFERENCE_HALF_LIFE = 100  # a rating's sampling weight halves every this many newer ratings
+
+# Columnar export (python -m reading_recs export)
+EXPORT_DIR = DATA_DIR / "export"
+EXPORT_CHUNK_ROWS = 5000  # rows per record batch / Parquet row group; bounds export memory
@@ -1,6 +1,8 @@
+import json
 import sqlite3
+from dataclasses import asdict
 from datetime import date, datetime
-from reading_recs.config import DB_PATH, DATA_DIR
+from reading_recs.config import DB_PATH, DATA_DIR, ARTICLE_TEXT_MAX_CHARS
 from reading_recs.models import Article, ScoredArticle
 
 SCHEMA = """
@@ -23,6 +25,22 @@ CREATE TABLE IF NOT EXISTS feed_stats (
     article_count INTEGER DEFAULT 0
 );
 
+CREATE TABLE IF NOT EXISTS feed_schedule (
+    feed_url TEXT PRIMARY KEY,
+    next_poll_at TEXT,
+    interval_hours REAL,
+    last_polled_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS circuit_breaker (
+    key TEXT PRIMARY KEY,
+    state TEXT,
+    consecutive_failures INTEGER DEFAULT 0,
+    open_until TEXT,
+    last_error TEXT,
+    updated_at TEXT
+);
+
 CREATE TABLE IF NOT EXISTS validation_log (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     url TEXT,
@@ -32,75 +50,351 @@ CREATE TABLE IF NOT EXISTS validation_log (
 );
 
 CREATE TABLE IF NOT EXISTS feedback (
-    url TEXT PRIMARY KEY,
+    profile TEXT NOT NULL DEFAULT 'default',
+    url TEXT,
     title TEXT,
     source TEXT,
     thumbs_up INTEGER,
     digest_date TEXT,
+    synced_at TEXT,
+    PRIMARY KEY (profile, url)
+);
+
+CREATE TABLE IF NOT EXISTS kv_synced_keys (
+    key TEXT PRIMARY KEY,
+    thumbs_up INTEGER,
     synced_at TEXT
 );
 
 CREATE TABLE IF NOT EXISTS preference_summary (
-    id INTEGER PRIMARY KEY CHECK (id = 1),
+    profile TEXT PRIMARY KEY,
     summary TEXT,
     feedback_count INTEGER,
-    updated_at TEXT
+    updated_at TEXT,
+    incremental_updates INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS recommendations (
+    profile TEXT,
+    url TEXT,
+    source TEXT,
+    run_date TEXT,
+    PRIMARY KEY (profile, url)
+);
+
+CREATE TABLE IF NOT EXISTS digests (
+    digest_id TEXT PRIMARY KEY,
+    profile TEXT,
+    created_at TEXT
 );
+
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT,
+    stage TEXT,
+    finished_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS run_articles (
+    run_id TEXT,
+    url TEXT,
+    position INTEGER,
+    article TEXT,
+    enriched INTEGER DEFAULT 0,
+    scored INTEGER DEFAULT 0,
+    llm_score REAL DEFAULT 0,
+    summary TEXT DEFAULT '',
+    PRIMARY KEY (run_id, url)
+);
+
+CREATE TABLE IF NOT EXISTS run_selections (
+    run_id TEXT,
+    profile TEXT,
+    position INTEGER,
+    url TEXT,
+    adjusted_score REAL,
+    PRIMARY KEY (run_id, profile, position)
+);
+
+CREATE TABLE IF NOT EXISTS export_watermarks (
+    name TEXT PRIMARY KEY,
+    watermark TEXT,
+    exported_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS run_deliveries (
+    run_id TEXT,
+    profile TEXT,
+    digest_id TEXT,
+    kv_pushed_at TEXT,
+    email_sent_at TEXT,
+    PRIMARY KEY (run_id, profile)
+);
+"""
+
+# Full-text indexes over articles: articles_fts for search, and a much smaller
+# title-only titles_fts for topic-repeat lookups. Both are external-content
+# tables, so the triggers keep them in step with every insert, replace, update
+# and delete.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, summary, text, content='articles', content_rowid='rowid'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS titles_fts USING fts5(
+    title, content='articles', content_rowid='rowid'
+);
+
+CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, summary, text) VALUES (new.rowid, new.title, new.summary, new.text);
+    INSERT INTO titles_fts (rowid, title) VALUES (new.rowid, new.title);
+END;
+
+CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, summary, text)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.text);
+    INSERT INTO titles_fts (titles_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+END;
+
+CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, summary, text)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.text);
+    INSERT INTO titles_fts (titles_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+    INSERT INTO articles_fts (rowid, title, summary, text) VALUES (new.rowid, new.title, new.summary, new.text);
+    INSERT INTO titles_fts (rowid, title) VALUES (new.rowid, new.title);
+END;
 """
 
+DEFAULT_PROFILE = "default"
+
 
 def get_conn() -> sqlite3.Connection:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     conn = sqlite3.connect(DB_PATH)
     conn.execute("PRAGMA journal_mode=WAL")
+    # INSERT OR REPLACE only fires delete triggers with this on; the search index relies on them
+    conn.execute("PRAGMA recursive_triggers=ON")
     return conn
 
 
+def get_readonly_conn() -> sqlite3.Connection:
+    """Read-only connection for long scans; under WAL it never blocks the pipeline's writes."""
+    return sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+
+
+# Shadow-scoring metrics added to the original validation_log columns
+_VALIDATION_COLUMNS = {
+    "model": "TEXT",
+    "shadow_score": "REAL",
+    "latency_ms": "REAL",
+    "shadow_latency_ms": "REAL",
+    "prompt_tokens": "REAL",
+    "shadow_prompt_tokens": "REAL",
+    "agrees": "INTEGER",
+    "rank_corr": "REAL",
+}
+
+
+# Per-run counters, summed over the stages (and resumes) of a run
+_RUN_METRIC_COLUMNS = {
+    "llm_calls": "INTEGER",
+    "llm_tokens": "INTEGER",
+    "llm_calls_saved": "INTEGER",
+    "shadow_calls": "INTEGER",
+    "downloads_aborted": "INTEGER",
+    "downloads_truncated": "INTEGER",
+    "download_bytes_skipped": "INTEGER",
+    "http_requests": "INTEGER",
+    "http_connections": "INTEGER",
+}
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _migrate_to_profiles(conn: sqlite3.Connection, had_recommendations: bool):
+    """Re-key single-reader tables by profile; existing rows belong to the default profile."""
+    if "profile" not in _columns(conn, "feedback"):
+        conn.executescript(f"""
+            ALTER TABLE feedback RENAME TO feedback_old;
+            CREATE TABLE feedback (
+                profile TEXT NOT NULL DEFAULT 'default',
+                url TEXT,
+                title TEXT,
+                source TEXT,
+                thumbs_up INTEGER,
+                digest_date TEXT,
+                synced_at TEXT,
+                PRIMARY KEY (profile, url)
+            );
+            INSERT INTO feedback (profile, url, title, source, thumbs_up, digest_date, synced_at)
+                SELECT '{DEFAULT_PROFILE}', url, title, source, thumbs_up, digest_date, synced_at FROM feedback_old;
+            DROP TABLE feedback_old;
+        """)
+    if "profile" not in _columns(conn, "preference_summary"):
+        conn.executescript(f"""
+            ALTER TABLE preference_summary RENAME TO preference_summary_old;
+            CREATE TABLE preference_summary (
+                profile TEXT PRIMARY KEY,
+                summary TEXT,
+                feedback_count INTEGER,
+                updated_at TEXT,
+                incremental_updates INTEGER DEFAULT 0
+            );
+            INSERT INTO preference_summary (profile, summary, feedback_count, updated_at, incremental_updates)
+                SELECT '{DEFAULT_PROFILE}', summary, feedback_count, updated_at, incremental_updates FROM preference_summary_old;
+            DROP TABLE preference_summary_old;
+        """)
+    if not had_recommendations:
+        conn.execute(
+            "INSERT OR IGNORE INTO recommendations (profile, url, source, run_date) "
+            "SELECT ?, url, source, run_date FROM articles WHERE recommended = 1",
+            (DEFAULT_PROFILE,),
+        )
+        conn.commit()
+
+
 def init_db():
     conn = get_conn()
+    had_recommendations = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'recommendations'"
+    ).fetchone() is not None
     conn.executescript(SCHEMA)
     try:
         conn.execute("ALTER TABLE articles RENAME COLUMN reason TO summary")
         conn.commit()
     except Exception:
         pass  # Already migrated or fresh DB
+    try:
+        conn.execute("ALTER TABLE preference_summary ADD COLUMN incremental_updates INTEGER DEFAULT 0")
+        conn.commit()
+    except Exception:
+        pass  # Already migrated
+    _migrate_to_profiles(conn, had_recommendations)
+    had_search_index = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+    ).fetchone() is not None
+    conn.executescript(SEARCH_SCHEMA)
+    if not had_search_index:
+        # Index the articles stored before the search indexes existed
+        conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+        conn.execute("INSERT INTO titles_fts (titles_fts) VALUES ('rebuild')")
+    for column, kind in _VALIDATION_COLUMNS.items():
+        if column not in _columns(conn, "validation_log"):
+            conn.execute(f"ALTER TABLE validation_log ADD COLUMN {column} {kind}")
+    for column, kind in _RUN_METRIC_COLUMNS.items():
+        if column not in _columns(conn, "runs"):
+            conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {kind} DEFAULT 0")
+    conn.commit()
     conn.close()
 
 
-def get_recent_source_counts(lookback_days: int) -> dict[str, int]:
+def get_recent_source_counts(lookback_days: int, profile: str = DEFAULT_PROFILE) -> dict[str, int]:
     conn = get_conn()
     rows = conn.execute(
-        "SELECT source, COUNT(*) FROM articles WHERE recommended = 1 AND run_date >= date('now', ? || ' days') GROUP BY source",
-        (f"-{lookback_days}",),
+        "SELECT source, COUNT(*) FROM recommendations WHERE profile = ? AND run_date >= date('now', ? || ' days') GROUP BY source",
+        (profile, f"-{lookback_days}"),
     ).fetchall()
     conn.close()
     return {row[0]: row[1] for row in rows}
 
 
-def get_previously_recommended() -> set[str]:
+def get_previously_recommended(profile: str = DEFAULT_PROFILE) -> set[str]:
     conn = get_conn()
-    rows = conn.execute("SELECT url FROM articles WHERE recommended = 1").fetchall()
+    rows = conn.execute("SELECT url FROM recommendations WHERE profile = ?", (profile,)).fetchall()
     conn.close()
     return {row[0] for row in rows}
 
 
+def _match_any(words: set[str]) -> str:
+    """FTS5 query matching any of the words."""
+    return " OR ".join(f'"{w}"' for w in sorted(words))
+
+
+def find_recent_recommended_matches(
+    words: set[str],
+    lookback_days: int,
+    profile: str = DEFAULT_PROFILE,
+) -> dict[str, str]:
+    """Titles, keyed by url, of this profile's recent recommendations sharing any of the words.
+
+    One query on the title index narrows the recent recommendations to those
+    worth comparing against; callers then measure overlap per candidate.
+    """
+    if not words:
+        return {}
+    conn = get_conn()
+    cutoff = f"-{lookback_days}"
+    # Articles are re-inserted on every save, so recent recommendations carry the
+    # newest rowids; bounding the match by the oldest of them skips older history.
+    (min_rowid,) = conn.execute(
+        "SELECT MIN(a.rowid) FROM recommendations r JOIN articles a ON a.url = r.url "
+        "WHERE r.profile = ? AND r.run_date >= date('now', ? || ' days')",
+        (profile, cutoff),
+    ).fetchone()
+    rows = []
+    if min_rowid is not None:
+        # CROSS JOIN keeps the index driving the join; otherwise SQLite re-runs the match per recommendation
+        rows = conn.execute(
+            "SELECT a.url, a.title FROM titles_fts "
+            "CROSS JOIN articles a ON a.rowid = titles_fts.rowid "
+            "JOIN recommendations r ON r.url = a.url AND r.profile = ? "
+            "WHERE titles_fts MATCH ? AND titles_fts.rowid >= ? AND r.run_date >= date('now', ? || ' days')",
+            (profile, _match_any(words), min_rowid, cutoff),
+        ).fetchall()
+    conn.close()
+    return {url: title or "" for url, title in rows}
+
+
+def search_articles(query: str, limit: int = 20) -> list[dict]:
+    """Full-text search over stored articles; query uses FTS5 syntax. Best matches first."""
+    conn = get_conn()
+    rows = conn.execute(
+        "SELECT a.url, a.title, a.source, a.run_date, a.llm_score, "
+        "snippet(articles_fts, -1, '[', ']', '…', 12) "
+        "FROM articles_fts JOIN articles a ON a.rowid = articles_fts.rowid "
+        "WHERE articles_fts MATCH ? ORDER BY articles_fts.rank LIMIT ?",
+        (query, limit),
+    ).fetchall()
+    conn.close()
+    return [
+        {"url": r[0], "title": r[1], "source": r[2], "run_date": r[3], "llm_score": r[4], "snippet": r[5]}
+        for r in rows
+    ]
+
+
+def save_recommendations(profile: str, selected: list[ScoredArticle]):
+    conn = get_conn()
+    today = date.today().isoformat()
+    conn.executemany(
+        "INSERT OR REPLACE INTO recommendations (profile, url, source, run_date) VALUES (?, ?, ?, ?)",
+        [(profile, sa.article.url, sa.article.source, today) for sa in selected],
+    )
+    conn.commit()
+    conn.close()
+
+
 def save_articles(scored_articles: list[ScoredArticle], recommended_urls: set[str]):
+    """Store scored articles; one recommended to any reader before stays flagged as recommended."""
     conn = get_conn()
     today = date.today().isoformat()
     for sa in scored_articles:
         conn.execute(
             """INSERT OR REPLACE INTO articles
                (url, title, source, text, embedding_score, llm_score, summary, recommended, run_date)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+               VALUES (?, ?, ?, ?, ?, ?, ?,
+                       MAX(?, COALESCE((SELECT recommended FROM articles WHERE url = ?), 0)), ?)""",
             (
                 sa.article.url,
                 sa.article.title,
                 sa.article.source,
-                sa.article.text[:5000],
+                sa.article.text[:ARTICLE_TEXT_MAX_CHARS],
                 0.0,
                 sa.llm_score,
                 sa.summary,
                 1 if sa.article.url in recommended_urls else 0,
+                sa.article.url,
                 today,
             ),
         )
@@ -120,6 +414,13 @@ def get_feed_stats(feed_url: str) -> tuple[float, float, int]:
     return (0.0, 0.0, 0)
 
 
+def get_all_feed_stats() -> dict[str, tuple[float, float, int]]:
+    conn = get_conn()
+    rows = conn.execute("SELECT feed_url, avg_comment_count, avg_score, article_count FROM feed_stats").fetchall()
+    conn.close()
+    return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+
 def update_feed_stats(feed_url: str, comment_count: float, score: float):
     old_avg_comments, old_avg_score, count = get_feed_stats(feed_url)
     if count == 0:
@@ -138,23 +439,140 @@ def update_feed_stats(feed_url: str, comment_count: float, score: float):
     conn.close()
 
 
-# --- Feedback tables ---
+def get_feed_schedule() -> dict[str, str]:
+    conn = get_conn()
+    rows = conn.execute("SELECT feed_url, next_poll_at FROM feed_schedule").fetchall()
+    conn.close()
+    return {row[0]: row[1] for row in rows}
+
 
-def save_feedback(url: str, title: str, source: str, thumbs_up: bool, digest_date: str):
+def save_feed_schedule(feed_url: str, next_poll_at: str, interval_hours: float, last_polled_at: str):
     conn = get_conn()
     conn.execute(
-        """INSERT OR REPLACE INTO feedback (url, title, source, thumbs_up, digest_date, synced_at)
+        """INSERT OR REPLACE INTO feed_schedule (feed_url, next_poll_at, interval_hours, last_polled_at)
+           VALUES (?, ?, ?, ?)""",
+        (feed_url, next_poll_at, interval_hours, last_polled_at),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_circuit(key: str) -> dict | None:
+    conn = get_conn()
+    row = conn.execute(
+        "SELECT state, consecutive_failures, open_until, last_error FROM circuit_breaker WHERE key = ?",
+        (key,),
+    ).fetchone()
+    conn.close()
+    if row:
+        return {"state": row[0], "consecutive_failures": row[1], "open_until": row[2], "last_error": row[3]}
+    return None
+
+
+def save_circuit(key: str, state: str, consecutive_failures: int, open_until: str | None, last_error: str | None):
+    conn = get_conn()
+    conn.execute(
+        """INSERT OR REPLACE INTO circuit_breaker (key, state, consecutive_failures, open_until, last_error, updated_at)
            VALUES (?, ?, ?, ?, ?, ?)""",
-        (url, title, source, 1 if thumbs_up else 0, digest_date, datetime.utcnow().isoformat()),
+        (key, state, consecutive_failures, open_until, last_error, datetime.utcnow().isoformat()),
     )
     conn.commit()
     conn.close()
 
 
-def get_all_feedback() -> list[dict]:
+def set_circuit_state(key: str, state: str):
+    conn = get_conn()
+    conn.execute(
+        "UPDATE circuit_breaker SET state = ?, updated_at = ? WHERE key = ?",
+        (state, datetime.utcnow().isoformat(), key),
+    )
+    conn.commit()
+    conn.close()
+
+
+def save_validation_rows(rows: list[dict], model: str, rank_corr: float | None):
+    """Log shadow-vs-production scores; rank_corr is the run-level Spearman correlation."""
+    conn = get_conn()
+    today = date.today().isoformat()
+    conn.executemany(
+        """INSERT INTO validation_log
+           (url, llm_score, run_date, model, shadow_score, latency_ms, shadow_latency_ms,
+            prompt_tokens, shadow_prompt_tokens, agrees, rank_corr)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        [
+            (r["url"], r["llm_score"], today, model, r["shadow_score"], r["latency_ms"], r["shadow_latency_ms"],
+             r["prompt_tokens"], r["shadow_prompt_tokens"], int(r["agrees"]), rank_corr)
+            for r in rows
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+# --- Feedback tables ---
+
+def save_feedback(url: str, title: str, source: str, thumbs_up: bool, digest_date: str, profile: str = DEFAULT_PROFILE):
+    conn = get_conn()
+    conn.execute(
+        """INSERT OR REPLACE INTO feedback (profile, url, title, source, thumbs_up, digest_date, synced_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        (profile, url, title, source, 1 if thumbs_up else 0, digest_date, datetime.utcnow().isoformat()),
+    )
+    conn.commit()
+    conn.close()
+
+
+def save_feedback_batch(rows: list[dict]):
+    """Write synced feedback rows and mark their KV keys as ingested, in one transaction.
+
+    Rows with url=None are keys whose value was unusable; they are only marked as synced.
+    """
+    synced_at = datetime.utcnow().isoformat()
+    conn = get_conn()
+    with conn:
+        conn.executemany(
+            """INSERT OR REPLACE INTO feedback (profile, url, title, source, thumbs_up, digest_date, synced_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (r["profile"], r["url"], r["title"], r["source"], 1 if r["thumbs_up"] else 0, r["digest_date"], synced_at)
+                for r in rows if r["url"]
+            ],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO kv_synced_keys (key, thumbs_up, synced_at) VALUES (?, ?, ?)",
+            [
+                (r["key"], None if r["thumbs_up"] is None else int(bool(r["thumbs_up"])), synced_at)
+                for r in rows
+            ],
+        )
+    conn.close()
+
+
+def get_synced_feedback_keys() -> dict[str, bool | None]:
+    conn = get_conn()
+    rows = conn.execute("SELECT key, thumbs_up FROM kv_synced_keys").fetchall()
+    conn.close()
+    return {row[0]: None if row[1] is None else bool(row[1]) for row in rows}
+
+
+def get_all_feedback(profile: str = DEFAULT_PROFILE) -> list[dict]:
+    conn = get_conn()
+    rows = conn.execute(
+        "SELECT url, title, source, thumbs_up, digest_date FROM feedback WHERE profile = ? ORDER BY synced_at",
+        (profile,),
+    ).fetchall()
+    conn.close()
+    return [
+        {"url": r[0], "title": r[1], "source": r[2], "thumbs_up": bool(r[3]), "digest_date": r[4]}
+        for r in rows
+    ]
+
+
+def get_feedback_since(synced_after: str, profile: str = DEFAULT_PROFILE) -> list[dict]:
     conn = get_conn()
     rows = conn.execute(
-        "SELECT url, title, source, thumbs_up, digest_date FROM feedback ORDER BY synced_at"
+        "SELECT url, title, source, thumbs_up, digest_date FROM feedback WHERE profile = ? AND synced_at > ? ORDER BY synced_at",
+        (profile, synced_after),
     ).fetchall()
     conn.close()
     return [
@@ -163,28 +581,286 @@ def get_all_feedback() -> list[dict]:
     ]
 
 
-def get_feedback_count() -> int:
+def get_feedback_count(profile: str = DEFAULT_PROFILE) -> int:
     conn = get_conn()
-    count = conn.execute("SELECT COUNT(*) FROM feedback").fetchone()[0]
+    count = conn.execute("SELECT COUNT(*) FROM feedback WHERE profile = ?", (profile,)).fetchone()[0]
     conn.close()
     return count
 
 
-def get_preference_summary() -> tuple[str, int] | None:
+def get_source_feedback(profile: str = DEFAULT_PROFILE) -> dict[str, tuple[int, int]]:
+    """(thumbs up, thumbs down) counts per source for a profile."""
+    conn = get_conn()
+    rows = conn.execute(
+        "SELECT source, SUM(thumbs_up), SUM(1 - thumbs_up) FROM feedback WHERE profile = ? GROUP BY source",
+        (profile,),
+    ).fetchall()
+    conn.close()
+    return {row[0]: (row[1], row[2]) for row in rows}
+
+
+def get_preference_summary(profile: str = DEFAULT_PROFILE) -> tuple[str, int] | None:
     conn = get_conn()
-    row = conn.execute("SELECT summary, feedback_count FROM preference_summary WHERE id = 1").fetchone()
+    row = conn.execute(
+        "SELECT summary, feedback_count FROM preference_summary WHERE profile = ?", (profile,)
+    ).fetchone()
     conn.close()
     if row:
         return (row[0], row[1])
     return None
 
 
-def save_preference_summary(summary: str, feedback_count: int):
+def get_preference_state(profile: str = DEFAULT_PROFILE) -> dict | None:
+    """Full preference_summary row, including bookkeeping for incremental updates."""
+    conn = get_conn()
+    row = conn.execute(
+        "SELECT summary, feedback_count, updated_at, incremental_updates FROM preference_summary WHERE profile = ?",
+        (profile,),
+    ).fetchone()
+    conn.close()
+    if row:
+        return {"summary": row[0], "feedback_count": row[1], "updated_at": row[2], "incremental_updates": row[3] or 0}
+    return None
+
+
+def save_preference_summary(summary: str, feedback_count: int, incremental_updates: int = 0, profile: str = DEFAULT_PROFILE):
+    conn = get_conn()
+    conn.execute(
+        """INSERT OR REPLACE INTO preference_summary (profile, summary, feedback_count, updated_at, incremental_updates)
+           VALUES (?, ?, ?, ?, ?)""",
+        (profile, summary, feedback_count, datetime.utcnow().isoformat(), incremental_updates),
+    )
+    conn.commit()
+    conn.close()
+
+
+# --- Digests ---
+
+def save_digest(digest_id: str, profile: str):
+    conn = get_conn()
+    conn.execute(
+        "INSERT OR REPLACE INTO digests (digest_id, profile, created_at) VALUES (?, ?, ?)",
+        (digest_id, profile, datetime.utcnow().isoformat()),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_digest_profiles() -> dict[str, str]:
+    conn = get_conn()
+    rows = conn.execute("SELECT digest_id, profile FROM digests").fetchall()
+    conn.close()
+    return {row[0]: row[1] for row in rows}
+
+
+# --- Run checkpoints ---
+
+def start_run() -> str:
+    run_id = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    conn = get_conn()
+    conn.execute(
+        "INSERT OR REPLACE INTO runs (run_id, started_at, stage) VALUES (?, ?, NULL)",
+        (run_id, datetime.utcnow().isoformat()),
+    )
+    conn.commit()
+    conn.close()
+    return run_id
+
+
+def get_latest_run() -> tuple[str, str | None, bool] | None:
+    """(run_id, last completed stage, finished) of the most recent run.
+
+    Only this run can be resumed; an older unfinished run was superseded by a
+    newer one and is abandoned.
+    """
+    conn = get_conn()
+    row = conn.execute("SELECT run_id, stage, finished_at FROM runs ORDER BY started_at DESC LIMIT 1").fetchone()
+    conn.close()
+    return (row[0], row[1], row[2] is not None) if row else None
+
+
+def set_run_stage(run_id: str, stage: str, finished: bool = False):
     conn = get_conn()
     conn.execute(
-        """INSERT OR REPLACE INTO preference_summary (id, summary, feedback_count, updated_at)
-           VALUES (1, ?, ?, ?)""",
-        (summary, feedback_count, datetime.utcnow().isoformat()),
+        "UPDATE runs SET stage = ?, finished_at = ? WHERE run_id = ?",
+        (stage, datetime.utcnow().isoformat() if finished else None, run_id),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_run_metrics(run_id: str) -> dict[str, int]:
+    conn = get_conn()
+    row = conn.execute(f"SELECT {', '.join(_RUN_METRIC_COLUMNS)} FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+    conn.close()
+    return dict(zip(_RUN_METRIC_COLUMNS, row or ()))
+
+
+def _set_run_metrics(conn: sqlite3.Connection, run_id: str, metrics: dict[str, int]):
+    if metrics:
+        assignments = ", ".join(f"{column} = ?" for column in metrics)
+        conn.execute(f"UPDATE runs SET {assignments} WHERE run_id = ?", [*metrics.values(), run_id])
+
+
+def set_run_metrics(run_id: str, metrics: dict[str, int]):
+    """Overwrite the run's totals for these counters (keyed by runs column)."""
+    conn = get_conn()
+    with conn:
+        _set_run_metrics(conn, run_id, metrics)
+    conn.close()
+
+
+def add_run_metrics(run_id: str, metrics: dict[str, int]):
+    """Add a stage's counters (keyed by runs column) to the run's totals."""
+    if not metrics:
+        return
+    assignments = ", ".join(f"{column} = {column} + ?" for column in metrics)
+    conn = get_conn()
+    conn.execute(f"UPDATE runs SET {assignments} WHERE run_id = ?", [*metrics.values(), run_id])
+    conn.commit()
+    conn.close()
+
+
+def save_run_articles(run_id: str, articles: list[Article]):
+    conn = get_conn()
+    with conn:
+        conn.execute("DELETE FROM run_articles WHERE run_id = ?", (run_id,))
+        conn.executemany(
+            "INSERT INTO run_articles (run_id, url, position, article) VALUES (?, ?, ?, ?)",
+            [(run_id, a.url, i, json.dumps(asdict(a))) for i, a in enumerate(articles)],
+        )
+    conn.close()
+
+
+def save_run_enriched(run_id: str, article: Article):
+    conn = get_conn()
+    conn.execute(
+        "UPDATE run_articles SET article = ?, enriched = 1 WHERE run_id = ? AND url = ?",
+        (json.dumps(asdict(article)), run_id, article.url),
+    )
+    conn.commit()
+    conn.close()
+
+
+def save_run_score(run_id: str, sa: ScoredArticle, metrics: dict[str, int] | None = None):
+    """Checkpoint one score, together with the run's LLM usage totals so far."""
+    conn = get_conn()
+    with conn:
+        conn.execute(
+            "UPDATE run_articles SET scored = 1, llm_score = ?, summary = ? WHERE run_id = ? AND url = ?",
+            (sa.llm_score, sa.summary, run_id, sa.article.url),
+        )
+        _set_run_metrics(conn, run_id, metrics or {})
+    conn.close()
+
+
+def load_run_articles(run_id: str) -> list[dict]:
+    """Checkpointed articles in fetch order, with their enrich/score progress."""
+    conn = get_conn()
+    rows = conn.execute(
+        "SELECT article, enriched, scored, llm_score, summary FROM run_articles WHERE run_id = ? ORDER BY position",
+        (run_id,),
+    ).fetchall()
+    conn.close()
+    return [
+        {"article": Article(**json.loads(r[0])), "enriched": bool(r[1]), "scored": bool(r[2]),
+         "llm_score": r[3], "summary": r[4]}
+        for r in rows
+    ]
+
+
+def save_run_selections(run_id: str, selections: dict[str, list[ScoredArticle]]):
+    conn = get_conn()
+    with conn:
+        conn.execute("DELETE FROM run_selections WHERE run_id = ?", (run_id,))
+        conn.executemany(
+            "INSERT INTO run_selections (run_id, profile, position, url, adjusted_score) VALUES (?, ?, ?, ?, ?)",
+            [
+                (run_id, profile, i, sa.article.url, sa.adjusted_score)
+                for profile, selected in selections.items()
+                for i, sa in enumerate(selected)
+            ],
+        )
+    conn.close()
+
+
+def load_run_selection(run_id: str, profile: str) -> list[ScoredArticle]:
+    conn = get_conn()
+    rows = conn.execute(
+        """SELECT ra.article, ra.llm_score, ra.summary, rs.adjusted_score
+           FROM run_selections rs JOIN run_articles ra ON ra.run_id = rs.run_id AND ra.url = rs.url
+           WHERE rs.run_id = ? AND rs.profile = ? ORDER BY rs.position""",
+        (run_id, profile),
+    ).fetchall()
+    conn.close()
+    return [
+        ScoredArticle(article=Article(**json.loads(r[0])), llm_score=r[1], summary=r[2], adjusted_score=r[3])
+        for r in rows
+    ]
+
+
+def compact_runs(keep: int):
+    """Shrink per-run checkpoints once they can no longer be resumed.
+
+    Finished runs drop the article copies in run_articles and keep only the
+    scores; checkpoints of all but the newest `keep` runs are deleted.
+    """
+    conn = get_conn()
+    with conn:
+        conn.execute(
+            "UPDATE run_articles SET article = NULL WHERE article IS NOT NULL "
+            "AND run_id IN (SELECT run_id FROM runs WHERE finished_at IS NOT NULL)"
+        )
+        for table in ("run_articles", "run_selections"):
+            conn.execute(
+                f"DELETE FROM {table} WHERE run_id NOT IN "
+                "(SELECT run_id FROM runs ORDER BY started_at DESC LIMIT ?)",
+                (keep,),
+            )
+    conn.close()
+
+
+def get_delivery(run_id: str, profile: str) -> dict:
+    conn = get_conn()
+    row = conn.execute(
+        "SELECT digest_id, kv_pushed_at, email_sent_at FROM run_deliveries WHERE run_id = ? AND profile = ?",
+        (run_id, profile),
+    ).fetchone()
+    conn.close()
+    if row:
+        return {"digest_id": row[0], "kv_pushed_at": row[1], "email_sent_at": row[2]}
+    return {"digest_id": None, "kv_pushed_at": None, "email_sent_at": None}
+
+
+def mark_delivery(run_id: str, profile: str, digest_id: str, kv_pushed: bool = False, email_sent: bool = False):
+    now = datetime.utcnow().isoformat()
+    conn = get_conn()
+    conn.execute(
+        """INSERT INTO run_deliveries (run_id, profile, digest_id) VALUES (?, ?, ?)
+           ON CONFLICT (run_id, profile) DO NOTHING""",
+        (run_id, profile, digest_id),
+    )
+    if kv_pushed:
+        conn.execute("UPDATE run_deliveries SET kv_pushed_at = ? WHERE run_id = ? AND profile = ?", (now, run_id, profile))
+    if email_sent:
+        conn.execute("UPDATE run_deliveries SET email_sent_at = ? WHERE run_id = ? AND profile = ?", (now, run_id, profile))
+    conn.commit()
+    conn.close()
+
+
+def get_export_watermarks() -> dict[str, str]:
+    conn = get_conn()
+    rows = conn.execute("SELECT name, watermark FROM export_watermarks").fetchall()
+    conn.close()
+    return dict(rows)
+
+
+def save_export_watermarks(watermarks: dict[str, str]):
+    conn = get_conn()
+    now = datetime.utcnow().isoformat()
+    conn.executemany(
+        "INSERT OR REPLACE INTO export_watermarks (name, watermark, exported_at) VALUES (?, ?, ?)",
+        [(name, str(mark), now) for name, mark in watermarks.items()],
     )
     conn.commit()
     conn.close()
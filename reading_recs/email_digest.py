@@ -48,26 +48,27 @@ def build_html(articles: list[ScoredArticle], feedback_url: str = "") -> str:
 </body></html>"""
 
 
-def send_email(html: str):
+def send_email(html: str, to: str = ""):
     """Send HTML email via Gmail SMTP."""
+    to = to or GMAIL_TO
     today = date.today().strftime("%B %d, %Y")
     msg = MIMEMultipart("alternative")
     msg["Subject"] = f"Reading Recs — {today}"
     msg["From"] = GMAIL_USER
-    msg["To"] = GMAIL_TO
+    msg["To"] = to
     msg.attach(MIMEText(html, "html"))
 
     with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
         server.login(GMAIL_USER, GMAIL_APP_PASSWORD)
-        server.sendmail(GMAIL_USER, GMAIL_TO, msg.as_string())
-    log.info("Email sent to %s", GMAIL_TO)
+        server.sendmail(GMAIL_USER, to, msg.as_string())
+    log.info("Email sent to %s", to)
 
 
-def build_and_send(articles: list[ScoredArticle], feedback_url: str = ""):
+def build_and_send(articles: list[ScoredArticle], feedback_url: str = "", to: str = ""):
     """Build digest HTML and send it."""
     html = build_html(articles, feedback_url)
     if not GMAIL_USER or not GMAIL_APP_PASSWORD:
         log.warning("Gmail credentials not configured — printing digest to stdout")
         print(html)
         return
-    send_email(html)
+    send_email(html, to)
@@ -0,0 +1,161 @@
+"""Stream run history out of SQLite into Parquet or Arrow IPC files for analysis.
+
+Each export reads one consistent snapshot through a read-only connection and
+writes one file per table under EXPORT_DIR/<table>/, holding only the rows
+added or changed since the previous export. Rows are pulled in chunks of
+EXPORT_CHUNK_ROWS and written as one record batch (Parquet row group) each, so
+memory stays flat however large the history grows.
+"""
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from reading_recs import db
+from reading_recs.config import EXPORT_DIR, EXPORT_CHUNK_ROWS
+
+log = logging.getLogger(__name__)
+
+FORMATS = {"parquet": "parquet", "arrow": "arrow"}  # format -> file extension
+
+_str, _int, _float = pa.string(), pa.int64(), pa.float64()
+
+
+def _rowid_export(table: str, columns: list[tuple[str, pa.DataType]]) -> dict:
+    """Export of a table whose writes all go through INSERT (OR REPLACE).
+
+    A replaced row gets a new rowid, so rows past the last exported rowid are
+    exactly the ones inserted or changed since; readers keep the latest per key.
+    These tables have no INTEGER PRIMARY KEY, so VACUUM may renumber their
+    rowids: export with full=True after vacuuming the database.
+    """
+    names = ", ".join(name for name, _ in columns)
+    return {
+        "watermark": f"SELECT MAX(rowid) FROM {table}",
+        "rows": f"SELECT {names} FROM {table} "
+                "WHERE rowid > CAST(? AS INTEGER) AND rowid <= ? ORDER BY rowid",
+        "initial": 0,
+        "rowid": True,
+        "schema": pa.schema(columns),
+    }
+
+
+def _run_export(select: str, columns: list[tuple[str, pa.DataType]]) -> dict:
+    """Export of per-run rows, taken once their run has finished.
+
+    run_articles and run_selections are updated in place while a run is in
+    progress, so they are watermarked by the finish time of their run.
+    """
+    return {
+        "watermark": "SELECT MAX(finished_at) FROM runs",
+        "rows": f"{select} WHERE r.finished_at > ? AND r.finished_at <= ?",
+        "initial": "",
+        "schema": pa.schema(columns),
+    }
+
+
+EXPORTS = {
+    "articles": _rowid_export("articles", [
+        ("url", _str), ("title", _str), ("source", _str), ("text", _str),
+        ("embedding_score", _float), ("llm_score", _float), ("summary", _str),
+        ("recommended", _int), ("run_date", _str),
+    ]),
+    "feedback": _rowid_export("feedback", [
+        ("profile", _str), ("url", _str), ("title", _str), ("source", _str),
+        ("thumbs_up", _int), ("digest_date", _str), ("synced_at", _str),
+    ]),
+    "feed_stats": _rowid_export("feed_stats", [
+        ("feed_url", _str), ("avg_comment_count", _float), ("avg_score", _float), ("article_count", _int),
+    ]),
+    "validation_log": _rowid_export("validation_log", [
+        ("id", _int), ("url", _str), ("embedding_score", _float), ("llm_score", _float), ("run_date", _str),
+        ("model", _str), ("shadow_score", _float), ("latency_ms", _float), ("shadow_latency_ms", _float),
+        ("prompt_tokens", _float), ("shadow_prompt_tokens", _float), ("agrees", _int), ("rank_corr", _float),
+    ]),
+    "runs": _run_export(
+        "SELECT r.run_id, r.started_at, r.stage, r.finished_at, r.llm_calls, r.llm_tokens, r.llm_calls_saved, "
+        "r.shadow_calls, r.downloads_aborted, r.downloads_truncated, r.download_bytes_skipped, "
+        "r.http_requests, r.http_connections FROM runs r", [
+            ("run_id", _str), ("started_at", _str), ("stage", _str), ("finished_at", _str),
+            ("llm_calls", _int), ("llm_tokens", _int), ("llm_calls_saved", _int), ("shadow_calls", _int),
+            ("downloads_aborted", _int), ("downloads_truncated", _int), ("download_bytes_skipped", _int),
+            ("http_requests", _int), ("http_connections", _int),
+        ]),
+    "run_articles": _run_export(
+        "SELECT a.run_id, a.url, a.position, a.enriched, a.scored, a.llm_score, a.summary "
+        "FROM run_articles a JOIN runs r ON r.run_id = a.run_id", [
+            ("run_id", _str), ("url", _str), ("position", _int), ("enriched", _int),
+            ("scored", _int), ("llm_score", _float), ("summary", _str),
+        ]),
+    "run_selections": _run_export(
+        "SELECT s.run_id, s.profile, s.position, s.url, s.adjusted_score "
+        "FROM run_selections s JOIN runs r ON r.run_id = s.run_id", [
+            ("run_id", _str), ("profile", _str), ("position", _int), ("url", _str), ("adjusted_score", _float),
+        ]),
+}
+
+
+def _open_writer(path: Path, schema: pa.Schema, fmt: str):
+    if fmt == "parquet":
+        return pq.ParquetWriter(path, schema, compression="zstd")
+    return pa.ipc.new_file(str(path), schema)
+
+
+def _write(cursor, schema: pa.Schema, path: Path, fmt: str) -> int:
+    """Stream a cursor into a new file in chunks; no file is left behind if there are no rows."""
+    tmp = path.with_name(path.name + ".tmp")
+    writer = None
+    count = 0
+    try:
+        while rows := cursor.fetchmany(EXPORT_CHUNK_ROWS):
+            columns = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            if writer is None:
+                writer = _open_writer(tmp, schema, fmt)
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            count += len(rows)
+        if writer is not None:
+            writer.close()
+            tmp.replace(path)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        tmp.unlink(missing_ok=True)
+        raise
+    return count
+
+
+def export(fmt: str = "parquet", full: bool = False, out_dir: Path = EXPORT_DIR) -> dict[str, int]:
+    """Export rows changed since the last export (everything if full). Returns rows written per table."""
+    watermarks = {} if full else db.get_export_watermarks()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    new_watermarks = {}
+    counts = {}
+
+    conn = db.get_readonly_conn()
+    try:
+        # One read transaction, so every table and watermark comes from the same snapshot
+        conn.execute("BEGIN")
+        for name, spec in EXPORTS.items():
+            (high,) = conn.execute(spec["watermark"]).fetchone()
+            if high is None:
+                continue
+            low = watermarks.get(name, spec["initial"])
+            if spec.get("rowid") and int(low) > high:
+                # Rowids shrank below the last export's, as after a VACUUM; the watermark means nothing now
+                log.warning("%s rowids were renumbered since the last export; exporting it in full", name)
+                low = spec["initial"]
+            table_dir = Path(out_dir) / name
+            table_dir.mkdir(parents=True, exist_ok=True)
+            path = table_dir / f"{stamp}.{FORMATS[fmt]}"
+            counts[name] = _write(conn.execute(spec["rows"], (low, high)), spec["schema"], path, fmt)
+            new_watermarks[name] = high
+            if counts[name]:
+                log.info("Exported %d %s rows to %s", counts[name], name, path)
+    finally:
+        conn.close()
+
+    db.save_export_watermarks(new_watermarks)
+    log.info("Export done: %d rows across %d tables", sum(counts.values()), sum(1 for c in counts.values() if c))
+    return counts
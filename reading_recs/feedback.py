@@ -1,22 +1,39 @@
 import hashlib
+import heapq
 import json
 import logging
+import math
+import random
+from concurrent.futures import ThreadPoolExecutor
 
 import httpx
-import openai
 
-from reading_recs import db
+from reading_recs import db, transport
 from reading_recs.config import (
     CLOUDFLARE_API_TOKEN,
     CLOUDFLARE_ACCOUNT_ID,
     CLOUDFLARE_KV_NAMESPACE_ID,
+    KV_LIST_PAGE_SIZE,
+    KV_SYNC_CONCURRENCY,
     OPENAI_API_KEY,
+    PREFERENCE_FULL_REBUILD_EVERY,
+    PREFERENCE_SAMPLE_SIZE,
+    PREFERENCE_HALF_LIFE,
 )
 from reading_recs.models import ScoredArticle
 
 log = logging.getLogger(__name__)
 
-_openai = openai.OpenAI(api_key=OPENAI_API_KEY)
+_openai = None
+
+
+def _get_openai():
+    global _openai
+    if _openai is None:
+        import openai
+
+        _openai = openai.OpenAI(api_key=OPENAI_API_KEY)
+    return _openai
 
 
 def _kv_headers() -> dict:
@@ -31,11 +48,14 @@ def _cf_configured() -> bool:
     return bool(CLOUDFLARE_API_TOKEN and CLOUDFLARE_ACCOUNT_ID and CLOUDFLARE_KV_NAMESPACE_ID)
 
 
-def push_digest_to_kv(digest_id: str, articles: list[ScoredArticle]):
-    """Write digest metadata to Cloudflare KV for the feedback page."""
+def push_digest_to_kv(digest_id: str, articles: list[ScoredArticle], profile: str = db.DEFAULT_PROFILE) -> bool:
+    """Write digest metadata to Cloudflare KV for the feedback page. Returns True if pushed."""
     if not _cf_configured():
         log.info("Cloudflare not configured — skipping KV push")
-        return
+        return False
+
+    # Votes are keyed by digest id, so remember whose digest this is
+    db.save_digest(digest_id, profile)
 
     payload = {
         "articles": [
@@ -53,87 +73,170 @@ def push_digest_to_kv(digest_id: str, articles: list[ScoredArticle]):
 
     key = f"digest:{digest_id}"
     url = f"{_kv_base_url()}/values/{key}"
-    resp = httpx.put(url, headers=_kv_headers(), content=json.dumps(payload), timeout=30.0)
+    resp = transport.put(url, "kv", headers=_kv_headers(), content=json.dumps(payload))
     if resp.status_code == 200:
         log.info("Pushed digest %s to KV (%d articles)", digest_id, len(articles))
-    else:
-        log.warning("Failed to push digest to KV: %s %s", resp.status_code, resp.text[:200])
+        return True
+    log.warning("Failed to push digest to KV: %s %s", resp.status_code, resp.text[:200])
+    return False
+
+
+def _list_feedback_keys() -> list[dict] | None:
+    """List all feedback: keys, following the KV list cursor across pages."""
+    url = f"{_kv_base_url()}/keys"
+    keys = []
+    cursor = ""
+    while True:
+        params = {"prefix": "feedback:", "limit": KV_LIST_PAGE_SIZE}
+        if cursor:
+            params["cursor"] = cursor
+        resp = transport.get(url, "kv", headers=_kv_headers(), params=params)
+        if resp.status_code != 200:
+            log.warning("Failed to list KV keys: %s %s", resp.status_code, resp.text[:200])
+            return None
+        body = resp.json()
+        keys.extend(body.get("result", []))
+        cursor = (body.get("result_info") or {}).get("cursor", "")
+        if not cursor:
+            return keys
+
+
+def _needs_sync(key: dict, synced: dict[str, bool | None]) -> bool:
+    """New keys always sync; known keys re-sync only if the vote in their metadata changed."""
+    if key["name"] not in synced:
+        return True
+    thumbs_up = (key.get("metadata") or {}).get("thumbs_up")
+    return thumbs_up is not None and thumbs_up != synced[key["name"]]
+
+
+def _fetch_feedback_value(key: str) -> tuple[str, dict | None, bool]:
+    """Read one feedback value. Returns (key, data, done); done=False means retry next run."""
+    try:
+        resp = transport.get(f"{_kv_base_url()}/values/{key}", "kv", headers=_kv_headers())
+    except httpx.HTTPError as e:
+        log.warning("Failed to read KV key %s: %s", key, e)
+        return key, None, False
+    if resp.status_code != 200:
+        log.warning("Failed to read KV key %s: %s", key, resp.status_code)
+        return key, None, False
+    try:
+        data = resp.json()
+    except json.JSONDecodeError:
+        log.warning("Invalid JSON in KV key %s", key)
+        return key, None, True
+    if not isinstance(data, dict) or "url" not in data:
+        log.warning("Malformed feedback in KV key %s", key)
+        return key, None, True
+    return key, data, True
 
 
 def sync_feedback():
-    """Pull feedback from Cloudflare KV into local SQLite."""
+    """Pull new or changed feedback from Cloudflare KV into local SQLite."""
     if not _cf_configured():
         log.info("Cloudflare not configured — skipping feedback sync")
         return
 
-    # List all keys with feedback: prefix
-    url = f"{_kv_base_url()}/keys"
-    resp = httpx.get(url, headers=_kv_headers(), params={"prefix": "feedback:"}, timeout=30.0)
-    if resp.status_code != 200:
-        log.warning("Failed to list KV keys: %s %s", resp.status_code, resp.text[:200])
+    keys = _list_feedback_keys()
+    if keys is None:
         return
-
-    keys = [k["name"] for k in resp.json().get("result", [])]
     if not keys:
         log.info("No feedback entries in KV")
         return
 
-    log.info("Found %d feedback entries in KV", len(keys))
-    for key in keys:
-        value_url = f"{_kv_base_url()}/values/{key}"
-        value_resp = httpx.get(value_url, headers=_kv_headers(), timeout=30.0)
-        if value_resp.status_code != 200:
-            log.warning("Failed to read KV key %s: %s", key, value_resp.status_code)
-            continue
+    synced = db.get_synced_feedback_keys()
+    pending = [k["name"] for k in keys if _needs_sync(k, synced)]
+    log.info("Found %d feedback entries in KV, %d new or changed", len(keys), len(pending))
+    if not pending:
+        return
 
-        try:
-            data = value_resp.json()
-        except json.JSONDecodeError:
-            log.warning("Invalid JSON in KV key %s", key)
-            continue
+    with ThreadPoolExecutor(max_workers=KV_SYNC_CONCURRENCY) as pool:
+        results = list(pool.map(_fetch_feedback_value, pending))
 
-        db.save_feedback(
-            url=data["url"],
-            title=data.get("title", ""),
-            source=data.get("source", ""),
-            thumbs_up=data.get("thumbs_up", True),
-            digest_date=data.get("digest_date", ""),
-        )
+    # Keys look like feedback:<digest_id>:<url_hash>
+    digest_profiles = db.get_digest_profiles()
+    rows = []
+    for key, data, done in results:
+        if not done:
+            continue
+        rows.append({
+            "key": key,
+            "profile": digest_profiles.get(key.split(":")[1], db.DEFAULT_PROFILE),
+            "url": data["url"] if data else None,
+            "title": data.get("title", "") if data else "",
+            "source": data.get("source", "") if data else "",
+            "thumbs_up": data.get("thumbs_up", True) if data else None,
+            "digest_date": data.get("digest_date", "") if data else "",
+        })
+
+    db.save_feedback_batch(rows)
+    log.info("Synced %d feedback entries to SQLite", sum(1 for r in rows if r["url"]))
+
+
+def _recency_weighted_sample(feedback: list[dict], k: int) -> list[dict]:
+    """Sample up to k ratings without replacement, favoring recent ones; keeps chronological order."""
+    if len(feedback) <= k:
+        return feedback
+    n = len(feedback)
+    # Efraimidis-Spirakis weighted sampling: keep the k largest u ** (1 / weight). Ranked in
+    # log space, as log(weight) - log(-log(u)), since old ratings' weights underflow to zero.
+    decay = math.log(2) / PREFERENCE_HALF_LIFE
+    keyed = [
+        (-(n - 1 - i) * decay - math.log(random.expovariate(1.0)), i)
+        for i in range(n)
+    ]
+    keep = sorted(i for _, i in heapq.nlargest(k, keyed))
+    return [feedback[i] for i in keep]
+
+
+def _format_ratings(feedback: list[dict]) -> str:
+    liked = [f for f in feedback if f["thumbs_up"]]
+    disliked = [f for f in feedback if not f["thumbs_up"]]
+    text = ""
+    if liked:
+        text += "LIKED:\n"
+        for f in liked:
+            text += f"- {f['title']} ({f['source']})\n"
+    if disliked:
+        text += "\nDISLIKED:\n"
+        for f in disliked:
+            text += f"- {f['title']} ({f['source']})\n"
+    return text
 
-    log.info("Synced %d feedback entries to SQLite", len(keys))
 
+def ensure_preference_summary(profile: str = db.DEFAULT_PROFILE):
+    """Update the preference summary if new feedback exists.
 
-def ensure_preference_summary():
-    """Regenerate preference summary if new feedback exists."""
-    current_count = db.get_feedback_count()
+    Normally only the old summary plus ratings synced since the last update are sent.
+    Every PREFERENCE_FULL_REBUILD_EVERY updates the profile is rebuilt from scratch on a
+    bounded, recency-weighted sample so drift from repeated incremental edits is reset.
+    """
+    current_count = db.get_feedback_count(profile)
     if current_count == 0:
-        log.info("No feedback yet — skipping preference summary")
+        log.info("[%s] No feedback yet — skipping preference summary", profile)
         return
 
-    existing = db.get_preference_summary()
-    if existing and existing[1] >= current_count:
-        log.info("Preference summary up to date (%d feedback entries)", current_count)
+    existing = db.get_preference_state(profile)
+    delta = db.get_feedback_since(existing["updated_at"], profile) if existing else []
+    if existing and not delta:
+        log.info("[%s] Preference summary up to date (%d feedback entries)", profile, current_count)
         return
 
-    old_summary = existing[0] if existing else "(none)"
+    old_summary = existing["summary"] if existing else "(none)"
+    full_rebuild = not existing or existing["incremental_updates"] + 1 >= PREFERENCE_FULL_REBUILD_EVERY
 
-    feedback = db.get_all_feedback()
-    liked = [f for f in feedback if f["thumbs_up"]]
-    disliked = [f for f in feedback if not f["thumbs_up"]]
-
-    prompt = "Based on the user's article ratings below, write a concise preference profile (1-2 paragraphs) describing what kinds of articles they prefer and dislike. Focus on patterns in topics, writing style, and depth.\n\n"
-
-    if liked:
-        prompt += "LIKED:\n"
-        for f in liked:
-            prompt += f"- {f['title']} ({f['source']})\n"
-    if disliked:
-        prompt += "\nDISLIKED:\n"
-        for f in disliked:
-            prompt += f"- {f['title']} ({f['source']})\n"
+    if full_rebuild:
+        sample = _recency_weighted_sample(db.get_all_feedback(profile), PREFERENCE_SAMPLE_SIZE)
+        prompt = "Based on the user's article ratings below, write a concise preference profile (1-2 paragraphs) describing what kinds of articles they prefer and dislike. Focus on patterns in topics, writing style, and depth.\n\n"
+        prompt += _format_ratings(sample)
+        incremental_updates = 0
+    else:
+        prompt = "Below is a user's current reading preference profile, followed by article ratings they have made since it was written. Rewrite the profile (1-2 paragraphs) to incorporate the new ratings, keeping what still holds. Focus on patterns in topics, writing style, and depth.\n\n"
+        prompt += f"CURRENT PROFILE:\n{old_summary}\n\nNEW RATINGS:\n"
+        prompt += _format_ratings(delta)
+        incremental_updates = existing["incremental_updates"] + 1
 
     try:
-        resp = _openai.chat.completions.create(
+        resp = _get_openai().chat.completions.create(
             model="gpt-4o-mini",
             max_tokens=300,
             messages=[{"role": "user", "content": prompt}],
@@ -143,8 +246,12 @@ def ensure_preference_summary():
         log.warning("Failed to generate preference summary: %s", e)
         return
 
-    log.info("Preference summary updated (%d → %d feedback entries)", existing[1] if existing else 0, current_count)
+    log.info("[%s] Preference summary %s (%d → %d feedback entries, %d prompt tokens)",
+             profile,
+             "rebuilt" if full_rebuild else "updated incrementally",
+             existing["feedback_count"] if existing else 0, current_count,
+             resp.usage.prompt_tokens if resp.usage else 0)
     log.info("  Old: %s", old_summary[:200])
     log.info("  New: %s", summary[:200])
 
-    db.save_preference_summary(summary, current_count)
+    db.save_preference_summary(summary, current_count, incremental_updates, profile)
@@ -1,22 +1,29 @@
+import hashlib
 import logging
 import re
 from datetime import datetime, timezone, timedelta
+from typing import Iterator
 from urllib.parse import quote as urlquote
 
-import feedparser
 import httpx
-from bs4 import BeautifulSoup
 
-from reading_recs.config import FEEDS_PATH, FEED_LOOKBACK_DAYS, FEED_MAX_ENTRIES, WORKER_BASE_URL
+from reading_recs.config import (
+    FEEDS_PATH,
+    FEED_LOOKBACK_DAYS,
+    FEED_MAX_ENTRIES,
+    WORKER_BASE_URL,
+    ARTICLE_TEXT_MAX_CHARS,
+    MAX_PAGE_BYTES,
+    MAX_FEED_BYTES,
+    TEXT_SPILL_ENABLED,
+    TEXT_SPILL_DIR,
+)
+from reading_recs import health, parse, transport
 from reading_recs.models import Article
+from reading_recs.schedule import due_feeds, record_poll
 
 log = logging.getLogger(__name__)
 
-_client = httpx.Client(timeout=15, follow_redirects=True, headers={
-    "User-Agent": "python-feedparser/6.0.8 +https://github.com/kurtmckee/feedparser"
-})
-
-
 def _proxy_url(url: str) -> str:
     """Route *.substack.com URLs through the Cloudflare Worker to bypass GitHub Actions IP blocks."""
     if re.search(r"\.substack\.com(/|$)", url) and WORKER_BASE_URL:
@@ -24,6 +31,17 @@ def _proxy_url(url: str) -> str:
     return url
 
 
+def _cap_text(url: str, text: str) -> str:
+    """Truncate text to what downstream stages use, spilling the full text to disk if enabled."""
+    if len(text) <= ARTICLE_TEXT_MAX_CHARS:
+        return text
+    if TEXT_SPILL_ENABLED:
+        TEXT_SPILL_DIR.mkdir(parents=True, exist_ok=True)
+        name = hashlib.sha256(url.encode()).hexdigest()[:16]
+        (TEXT_SPILL_DIR / f"{name}.txt").write_text(text)
+    return text[:ARTICLE_TEXT_MAX_CHARS]
+
+
 def parse_feeds() -> list[dict]:
     """Parse feeds.txt, preserving section comments such as "# top"."""
     feeds = []
@@ -54,136 +72,179 @@ def parse_feeds() -> list[dict]:
     return feeds
 
 
-def fetch_full_text(url: str) -> str | None:
-    """Attempt to fetch and extract article body text."""
-    try:
-        resp = _client.get(url)
+# Per-run counters for downloads cut short by type or size
+_download_stats = {"aborted": 0, "truncated": 0, "bytes_skipped": 0}
+
+# Never a feed or an article; generic binary types are left alone since some servers send RSS as octet-stream
+_MEDIA_TYPES = ("audio/", "video/", "image/", "application/pdf")
+
+
+def _stream_get(url: str, purpose: str, max_bytes: int, html_only: bool) -> tuple[bytes, str | None] | None:
+    """GET url, reading at most max_bytes of the body.
+
+    Returns (body, encoding) or None if the Content-Type is unwanted: anything
+    but HTML when html_only, else audio/video/images/PDFs. The encoding is
+    httpx's, so an unknown charset in the header falls back to utf-8. Raises
+    like httpx on network or HTTP errors.
+    """
+    with transport.stream("GET", url, purpose) as resp:
         resp.raise_for_status()
+        content_type = resp.headers.get("content-type", "").split(";")[0].strip().lower()
+        length = int(resp.headers.get("content-length", 0) or 0)
+        if (html_only and content_type and content_type not in ("text/html", "application/xhtml+xml")) or (
+            content_type.startswith(_MEDIA_TYPES)
+        ):
+            _download_stats["aborted"] += 1
+            _download_stats["bytes_skipped"] += length
+            log.debug("Skipped %s: content type %s", url, content_type)
+            return None
+
+        chunks = []
+        received = 0
+        for chunk in resp.iter_bytes():
+            chunks.append(chunk)
+            received += len(chunk)
+            if received >= max_bytes:
+                _download_stats["truncated"] += 1
+                _download_stats["bytes_skipped"] += max(0, length - max_bytes)
+                log.debug("Truncated %s at %d bytes", url, max_bytes)
+                break
+        return b"".join(chunks)[:max_bytes], resp.encoding
+
+
+def _download_page(url: str) -> tuple[bytes, str | None] | None:
+    """Download an article page, returning (body, encoding) for text extraction."""
+    host = health.host_key(url)
+    if not health.allow(host):
+        log.info("  Skipping %s: circuit open for %s", url, host)
+        return None
+    try:
+        page = _stream_get(url, "page", MAX_PAGE_BYTES, html_only=True)
+    except httpx.HTTPStatusError as e:
+        # The host answered; a 4xx/5xx on one page says little about the host itself
+        health.record_success(host)
+        log.debug("Failed to fetch %s: %s", url, e)
+        return None
     except Exception as e:
+        health.record_failure(host, e)
         log.debug("Failed to fetch %s: %s", url, e)
         return None
+    health.record_success(host)
+    return page
 
-    soup = BeautifulSoup(resp.text, "lxml")
-
-    # Try <article>, then largest <div>, then <body>
-    article_tag = soup.find("article")
-    if article_tag:
-        return article_tag.get_text(separator=" ", strip=True)
 
-    divs = soup.find_all("div")
-    if divs:
-        largest = max(divs, key=lambda d: len(d.get_text()))
-        text = largest.get_text(separator=" ", strip=True)
-        if len(text) > 200:
-            return text
+def _download_pages(urls: list[str], max_chars: int | None) -> Iterator[tuple[str, tuple]]:
+    for url in urls:
+        page = _download_page(url)
+        if page:
+            content, encoding = page
+            yield url, (content, encoding, max_chars)
 
-    body = soup.find("body")
-    if body:
-        return body.get_text(separator=" ", strip=True)
 
-    return None
+def fetch_full_text(urls: list[str]) -> dict[str, str]:
+    """Fetch pages and extract article body text; URLs that fail are left out."""
+    # Keep the full text when spilling it to disk; otherwise cap in the worker to cut IPC
+    max_chars = None if TEXT_SPILL_ENABLED else ARTICLE_TEXT_MAX_CHARS
+    return {url: text for url, text in parse.run_iter(parse.extract_text, _download_pages(urls, max_chars)) if text}
 
 
-def _extract_aggregator_links(html: str) -> list[str]:
-    """Extract outbound article URLs from an aggregator entry's HTML summary."""
-    soup = BeautifulSoup(html, "lxml")
-    urls = []
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        if href.startswith("http") and "comment" not in href.lower():
-            urls.append(href)
-    return urls
-
+def _download_feeds(feeds: list[dict], max_chars: int | None) -> Iterator[tuple[dict, tuple]]:
+    """Download due feeds whose circuit allows it, yielding (feed_info, parse job)."""
+    for feed_info in feeds:
+        key = health.feed_key(feed_info["url"])
+        if not health.allow(key):
+            log.info("  %s: skipped, circuit open after repeated failures", feed_info["title"])
+            continue
 
-def _get_comment_count(entry) -> int:
-    """Extract comment count from RSS entry if available."""
-    # slash:comments (used by many feeds)
-    if hasattr(entry, "slash_comments"):
         try:
-            return int(entry.slash_comments)
-        except (ValueError, TypeError):
-            pass
-    return 0
-
+            feed = _stream_get(_proxy_url(feed_info["url"]), "feed", MAX_FEED_BYTES, html_only=False)
+        except Exception as e:
+            health.record_failure(key, e)
+            log.warning("  %s: fetch failed: %s", feed_info["title"], e)
+            continue
+        if feed is None:
+            health.record_failure(key, "unexpected content type")
+            log.warning("  %s: fetch failed: not a feed", feed_info["title"])
+            continue
+        yield feed_info, (feed[0], feed_info["max_entries"], feed_info["is_aggregator"], max_chars)
 
-def _entry_published(entry) -> datetime | None:
-    """Return entry publish time as UTC datetime, or None if unavailable."""
-    t = getattr(entry, "published_parsed", None) or getattr(entry, "updated_parsed", None)
-    if t:
-        return datetime(*t[:6], tzinfo=timezone.utc)
-    return None
 
+def fetch_feeds(force_all: bool = False) -> list[Article]:
+    """Fetch feeds from feeds.txt that are due for polling and return Article objects.
 
-def fetch_feeds() -> list[Article]:
-    """Fetch all feeds from feeds.txt and return Article objects."""
-    feeds = parse_feeds()
+    Feeds are parsed in the pool batch by batch while later feeds are still
+    downloading, so raw feed bodies don't pile up in memory.
+    """
+    all_feeds = parse_feeds()
+    feeds = due_feeds(all_feeds, force_all)
     articles = []
-    cutoff = datetime.now(timezone.utc) - timedelta(days=FEED_LOOKBACK_DAYS)
-
-    for feed_info in feeds:
-        try:
-            resp = _client.get(_proxy_url(feed_info["url"]))
-            resp.raise_for_status()
-        except Exception as e:
-            log.warning("  %s: fetch failed: %s", feed_info["title"], e)
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=FEED_LOOKBACK_DAYS)).timestamp()
+
+    max_chars = None if TEXT_SPILL_ENABLED else ARTICLE_TEXT_MAX_CHARS
+    for feed_info, parsed in parse.run_iter(parse.parse_feed, _download_feeds(feeds, max_chars)):
+        key = health.feed_key(feed_info["url"])
+        if "error" in parsed:
+            health.record_failure(key, parsed["error"])
+            log.warning("  %s: parse failed: %s", feed_info["title"], parsed["error"])
             continue
 
-        try:
-            parsed = feedparser.parse(resp.text)
-        except Exception as e:
-            log.warning("  %s: parse failed: %s", feed_info["title"], e)
-            continue
+        health.record_success(key)
 
-        total_entries = len(parsed.entries[:feed_info["max_entries"]])
+        record_poll(feed_info["url"], [datetime.fromtimestamp(p, timezone.utc) for p in parsed["published"]])
+
+        total_entries = len(parsed["entries"])
         before = len(articles)
         skipped_old = 0
 
-        for entry in parsed.entries[:feed_info["max_entries"]]:
-            pub = _entry_published(entry)
-            if pub and pub < cutoff:
+        for entry in parsed["entries"]:
+            if entry["published"] and entry["published"] < cutoff:
                 skipped_old += 1
                 continue
 
             if feed_info["is_aggregator"]:
-                # For aggregator feeds, extract linked URLs as separate articles
-                summary_html = getattr(entry, "summary", "")
-                linked_urls = _extract_aggregator_links(summary_html)
-                for url in linked_urls:
+                for url in entry["links"]:
                     articles.append(Article(
                         url=url,
-                        title=getattr(entry, "title", url),
+                        title=entry["title"] or url,
                         source=feed_info["title"],
                         text="",  # will be filled by full-text fetch
                         source_section=feed_info["section"],
                     ))
             else:
-                link = getattr(entry, "link", None)
+                link = entry["link"]
                 if not link:
                     continue
-                summary = getattr(entry, "summary", "")
-                # Strip HTML from summary
-                if summary:
-                    summary = BeautifulSoup(summary, "lxml").get_text(separator=" ", strip=True)
-
                 articles.append(Article(
                     url=link,
-                    title=getattr(entry, "title", link),
+                    title=entry["title"] or link,
                     source=feed_info["title"],
-                    text=summary,
+                    text=_cap_text(link, entry["text"]),
                     source_section=feed_info["section"],
-                    comment_count=_get_comment_count(entry),
+                    comment_count=entry["comment_count"],
                 ))
 
         added = len(articles) - before
         log.info("  %s: %d entries in feed, %d too old, %d added",
                  feed_info["title"], total_entries, skipped_old, added)
 
+    health.log_broken_feeds(all_feeds)
     return articles
 
 
-def fetch_all() -> list[Article]:
+def download_metrics() -> dict[str, int]:
+    """This fetch's download counters, keyed by runs column."""
+    return {
+        "downloads_aborted": _download_stats["aborted"],
+        "downloads_truncated": _download_stats["truncated"],
+        "download_bytes_skipped": _download_stats["bytes_skipped"],
+    }
+
+
+def fetch_all(force_all: bool = False) -> list[Article]:
     """Full fetch pipeline: get feeds, then fill in missing full text."""
-    articles = fetch_feeds()
+    for k in _download_stats:
+        _download_stats[k] = 0
+    articles = fetch_feeds(force_all)
 
     # Deduplicate by URL
     seen = set()
@@ -195,13 +256,15 @@ def fetch_all() -> list[Article]:
     articles = deduped
 
     # Fetch full text for articles with short excerpts
-    for article in articles:
-        word_count = len(article.text.split()) if article.text else 0
-        if word_count < 100:
-            full_text = fetch_full_text(article.url)
-            if full_text:
-                article.text = full_text
-            else:
-                article.limited_data = True
+    short = [a for a in articles if (len(a.text.split()) if a.text else 0) < 100]
+    full_texts = fetch_full_text([a.url for a in short])
+    for article in short:
+        full_text = full_texts.get(article.url)
+        if full_text:
+            article.text = _cap_text(article.url, full_text)
+        else:
+            article.limited_data = True
 
+    log.info("Downloads: %d aborted by content type, %d truncated at size cap, ~%.1f MB not downloaded",
+             _download_stats["aborted"], _download_stats["truncated"], _download_stats["bytes_skipped"] / 1e6)
     return articles
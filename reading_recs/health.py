@@ -0,0 +1,97 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+
+from reading_recs import db
+from reading_recs.config import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_BASE_COOLDOWN_HOURS,
+    CIRCUIT_MAX_COOLDOWN_HOURS,
+    CIRCUIT_CHRONIC_FAILURES,
+)
+
+log = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+# Keys with a half-open trial request in flight this run; further requests wait for the trial
+_trials: set[str] = set()
+
+
+def feed_key(feed_url: str) -> str:
+    return f"feed:{feed_url}"
+
+
+def host_key(url: str) -> str:
+    return f"host:{urlparse(url).netloc.lower()}"
+
+
+def _cooldown(consecutive_failures: int) -> timedelta:
+    """Exponential cooldown, doubling with each failure past the threshold."""
+    exponent = max(0, consecutive_failures - CIRCUIT_FAILURE_THRESHOLD)
+    hours = min(CIRCUIT_MAX_COOLDOWN_HOURS, CIRCUIT_BASE_COOLDOWN_HOURS * 2 ** exponent)
+    return timedelta(hours=hours)
+
+
+def allow(key: str) -> bool:
+    """Return True if a request for this feed/host may go out, moving open circuits to half-open."""
+    row = db.get_circuit(key)
+    if row is None or row["state"] == CLOSED:
+        return True
+
+    if row["state"] == OPEN:
+        if datetime.now(timezone.utc) < datetime.fromisoformat(row["open_until"]):
+            return False
+        db.set_circuit_state(key, HALF_OPEN)
+
+    # Half-open: let a single trial request through per run
+    if key in _trials:
+        return False
+    _trials.add(key)
+    return True
+
+
+def record_success(key: str):
+    _trials.discard(key)
+    row = db.get_circuit(key)
+    if row is None:
+        return
+    if row["state"] != CLOSED:
+        log.info("Circuit %s closed after successful trial", key)
+    db.save_circuit(key, CLOSED, 0, None, row["last_error"])
+
+
+def record_failure(key: str, error: Exception | str):
+    _trials.discard(key)
+    row = db.get_circuit(key)
+    failures = (row["consecutive_failures"] if row else 0) + 1
+    error_text = str(error)[:200]
+
+    if failures >= CIRCUIT_FAILURE_THRESHOLD:
+        open_until = datetime.now(timezone.utc) + _cooldown(failures)
+        db.save_circuit(key, OPEN, failures, open_until.isoformat(), error_text)
+        log.info("Circuit %s open until %s (%d consecutive failures)", key, open_until.isoformat(timespec="minutes"), failures)
+    else:
+        db.save_circuit(key, CLOSED, failures, None, error_text)
+
+
+def broken_feeds_report(feeds: list[dict]) -> list[dict]:
+    """Return feeds from feeds.txt that have failed at least CIRCUIT_CHRONIC_FAILURES times in a row."""
+    broken = []
+    for feed_info in feeds:
+        row = db.get_circuit(feed_key(feed_info["url"]))
+        if row and row["consecutive_failures"] >= CIRCUIT_CHRONIC_FAILURES:
+            broken.append({**feed_info, **row})
+    return broken
+
+
+def log_broken_feeds(feeds: list[dict]):
+    broken = broken_feeds_report(feeds)
+    if not broken:
+        return
+    log.warning("%d chronically broken feeds (consider pruning from feeds.txt):", len(broken))
+    for b in broken:
+        log.warning("  %s | %s — %d consecutive failures, last error: %s",
+                    b["title"], b["url"], b["consecutive_failures"], b["last_error"])
@@ -1,14 +1,15 @@
 import logging
+import sys
+import tracemalloc
 import uuid
 
 from reading_recs import db
-from reading_recs.config import WORKER_BASE_URL
-from reading_recs.fetch import fetch_all
-from reading_recs.popularity import enrich
-from reading_recs.feedback import push_digest_to_kv, sync_feedback, ensure_preference_summary
-from reading_recs.score import score_and_select
-from reading_recs.email_digest import build_and_send
-from reading_recs.models import ScoredArticle
+from reading_recs.config import WORKER_BASE_URL, REPORT_MEMORY, RUN_HISTORY_KEEP
+from reading_recs.models import Profile, ScoredArticle
+from reading_recs.profiles import load_profiles
+
+# Pipeline stages import their heavy dependencies (feedparser, bs4, openai,
+# httpx) on first use so a CLI subcommand only pays for the stage it runs.
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,51 +17,201 @@ logging.basicConfig(
 )
 log = logging.getLogger(__name__)
 
+# Checkpointed stages, in order; runs.stage records the last one completed
+STAGES = ["fetch", "enrich", "score", "send"]
 
-def run():
-    log.info("Initializing database")
-    db.init_db()
+# Modules each stage needs; the CLI imports these up front to time them
+STAGE_MODULES = {
+    "sync-feedback": ["reading_recs.feedback"],
+    "fetch": ["reading_recs.fetch"],
+    "enrich": ["reading_recs.popularity"],
+    "score": ["reading_recs.score"],
+    "send": ["reading_recs.feedback", "reading_recs.email_digest"],
+}
+
+
+def _log_peak_memory(stage: str):
+    """Log the tracemalloc peak since the previous stage, then reset it."""
+    if not tracemalloc.is_tracing():
+        return
+    current, peak = tracemalloc.get_traced_memory()
+    log.info("Memory after %s: peak %.1f MB, current %.1f MB", stage, peak / 1e6, current / 1e6)
+    tracemalloc.reset_peak()
+
+
+def run_ready_for(stage: str) -> str:
+    """The latest run, if it is unfinished and has completed the stage before `stage`; exits otherwise."""
+    latest = db.get_latest_run()
+    if not latest:
+        sys.exit("No run found — start one with: python -m reading_recs fetch")
+    run_id, done, finished = latest
+    if finished:
+        sys.exit(f"Run {run_id} already finished — start a new one with: python -m reading_recs fetch")
+    needed = STAGES[STAGES.index(stage) - 1]
+    if done is None or STAGES.index(done) < STAGES.index(needed):
+        sys.exit(f"Run {run_id} has not completed '{needed}' (last completed: {done or 'none'}) — "
+                 f"run: python -m reading_recs {needed}")
+    return run_id
+
+
+def _save_http_metrics(run_id: str):
+    """Add the HTTP requests made since the last save to the run's metrics."""
+    # Not loaded until some stage has made a request
+    transport = sys.modules.get("reading_recs.transport")
+    if transport:
+        db.add_run_metrics(run_id, transport.http_metrics())
+
+
+def sync_stage(profiles: list[Profile]):
+    from reading_recs.feedback import sync_feedback, ensure_preference_summary
 
     log.info("Syncing feedback from Cloudflare KV")
     sync_feedback()
-    ensure_preference_summary()
+    for profile in profiles:
+        ensure_preference_summary(profile.name)
+
+
+def fetch_stage(run_id: str, profiles: list[Profile], force_all: bool = False):
+    from reading_recs.fetch import fetch_all, download_metrics
 
     log.info("Fetching articles from feeds")
-    articles = fetch_all()
+    articles = fetch_all(force_all)
     log.info("Fetched %d articles", len(articles))
 
-    previously_recommended = db.get_previously_recommended()
+    # Only drop articles every reader has already been sent; per-reader exclusion happens at re-rank
+    previously_recommended = set.intersection(*(db.get_previously_recommended(p.name) for p in profiles))
     articles = [a for a in articles if a.url not in previously_recommended]
     log.info("%d new articles after excluding previously recommended", len(articles))
 
-    if not articles:
-        log.info("No new articles, sending empty digest")
-        build_and_send([])
-        return
-
-    log.info("Enriching with popularity signals")
-    articles = enrich(articles)
-
-    # Convert articles directly to ScoredArticle list (no embedding filter)
-    candidates = [ScoredArticle(article=a) for a in articles]
-
-    log.info("Running LLM scoring on %d articles", len(candidates))
-    selected = score_and_select(candidates)
-    log.info("Selected %d articles for digest", len(selected))
-
-    recommended_urls = {sa.article.url for sa in selected}
+    db.save_run_articles(run_id, articles)
+    db.add_run_metrics(run_id, download_metrics())
+    _save_http_metrics(run_id)
+    db.set_run_stage(run_id, "fetch")
+
+
+def enrich_stage(run_id: str):
+    from reading_recs.popularity import enrich
+
+    rows = db.load_run_articles(run_id)
+    pending = [r["article"] for r in rows if not r["enriched"]]
+    log.info("Enriching with popularity signals (%d of %d articles left)", len(pending), len(rows))
+    enrich(pending, on_enriched=lambda a: db.save_run_enriched(run_id, a))
+    _save_http_metrics(run_id)
+    db.set_run_stage(run_id, "enrich")
+
+
+def score_stage(run_id: str, profiles: list[Profile]):
+    """Score once, then re-rank and select a digest per reader."""
+    from reading_recs.score import score_candidates, select_for_profiles, llm_metrics
+
+    # Convert articles directly to ScoredArticle list (no embedding filter),
+    # restoring any scores checkpointed by an interrupted run
+    rows = db.load_run_articles(run_id)
+    candidates = [ScoredArticle(article=r["article"], llm_score=r["llm_score"], summary=r["summary"]) for r in rows]
+    scored_urls = {r["article"].url for r in rows if r["scored"]}
+
+    # A lone reader without profiles.toml keeps the personalized LLM prompt;
+    # otherwise the LLM score is shared and personalization is a local re-rank.
+    personal = profiles[0] if len(profiles) == 1 and not profiles[0].local_rerank else None
+    log.info("Running LLM scoring on %d articles (%d already scored)", len(candidates), len(scored_urls))
+    score_candidates(
+        candidates, personal, scored_urls,
+        on_scored=lambda sa: db.save_run_score(run_id, sa, llm_metrics()),
+        spent=db.get_run_metrics(run_id),
+        readers=profiles,
+    )
+
+    selections = select_for_profiles(candidates, profiles)
+    recommended_urls = set()
+    for name, selected in selections.items():
+        log.info("[%s] Selected %d articles for digest", name, len(selected))
+        recommended_urls.update(sa.article.url for sa in selected)
     db.save_articles(candidates, recommended_urls)
+    db.save_run_selections(run_id, selections)
+    db.set_run_metrics(run_id, llm_metrics())
+    db.set_run_stage(run_id, "score")
+
+
+def send_stage(run_id: str, profiles: list[Profile]):
+    """Push each reader's digest to KV and email it, at most once per run."""
+    from reading_recs.feedback import push_digest_to_kv
+    from reading_recs.email_digest import build_and_send
+
+    for profile in profiles:
+        selected = db.load_run_selection(run_id, profile.name)
+        delivery = db.get_delivery(run_id, profile.name)
+        if delivery["email_sent_at"]:
+            log.info("[%s] Digest for run %s already sent — skipping", profile.name, run_id)
+            continue
+
+        digest_id = delivery["digest_id"] or uuid.uuid4().hex
+        db.mark_delivery(run_id, profile.name, digest_id)
+        feedback_url = ""
+        if selected:
+            # Push digest to KV for feedback page
+            if delivery["kv_pushed_at"]:
+                log.info("[%s] Digest %s already in KV", profile.name, digest_id)
+            elif push_digest_to_kv(digest_id, selected, profile.name):
+                db.mark_delivery(run_id, profile.name, digest_id, kv_pushed=True)
+
+            if WORKER_BASE_URL:
+                feedback_url = f"{WORKER_BASE_URL.rstrip('/')}/feedback/{digest_id}"
+        else:
+            log.info("[%s] No articles selected, sending empty digest", profile.name)
+
+        log.info("[%s] Sending email digest", profile.name)
+        build_and_send(selected, feedback_url, to=profile.email)
+        # Recorded only once sent, so a score stage re-run after a crash still sees these
+        # articles as new; saving again is harmless if we crash before marking the email sent
+        db.save_recommendations(profile.name, selected)
+        db.mark_delivery(run_id, profile.name, digest_id, email_sent=True)
+
+    _save_http_metrics(run_id)
+    db.set_run_stage(run_id, "send", finished=True)
+    db.compact_runs(RUN_HISTORY_KEEP)
+
+
+def run(force_all: bool = False, resume: bool = False):
+    """Run the full pipeline, checkpointing each stage under a run id.
+
+    With resume, the latest run continues after its last completed stage,
+    unless it already finished.
+    """
+    if REPORT_MEMORY:
+        tracemalloc.start()
 
-    # Push digest to KV for feedback page
-    digest_id = uuid.uuid4().hex
-    push_digest_to_kv(digest_id, selected)
-
-    feedback_url = ""
-    if WORKER_BASE_URL:
-        feedback_url = f"{WORKER_BASE_URL.rstrip('/')}/feedback/{digest_id}"
-
-    log.info("Sending email digest")
-    build_and_send(selected, feedback_url)
+    log.info("Initializing database")
+    db.init_db()
+    profiles = load_profiles()
+
+    latest = db.get_latest_run() if resume else None
+    if latest and not latest[2]:
+        run_id, done, _ = latest
+        log.info("Resuming run %s after stage '%s'", run_id, done or "start")
+    else:
+        if latest:
+            log.info("Latest run %s already finished — nothing to resume", latest[0])
+        run_id, done = db.start_run(), None
+        log.info("Starting run %s", run_id)
+    remaining = STAGES[STAGES.index(done) + 1:] if done else STAGES
+
+    sync_stage(profiles)
+    _log_peak_memory("sync")
+
+    for stage in remaining:
+        if stage == "fetch":
+            fetch_stage(run_id, profiles, force_all)
+        elif stage == "enrich":
+            enrich_stage(run_id)
+        elif stage == "score":
+            score_stage(run_id, profiles)
+        elif stage == "send":
+            send_stage(run_id, profiles)
+        _log_peak_memory(stage)
+
+    from reading_recs import transport
+
+    transport.log_stats()
     log.info("Done")
 
 
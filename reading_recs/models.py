@@ -1,7 +1,8 @@
 from dataclasses import dataclass, field
+from pathlib import Path
 
 
-@dataclass
+@dataclass(slots=True)
 class Article:
     url: str
     title: str
@@ -13,9 +14,19 @@ class Article:
     limited_data: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class ScoredArticle:
     article: Article
     llm_score: float = 0.0
     summary: str = ""
     adjusted_score: float = 0.0
+
+
+@dataclass(slots=True)
+class Profile:
+    name: str
+    email: str
+    favorites_path: Path
+    top_boost: float = 0.0
+    source_boosts: dict[str, float] = field(default_factory=dict)
+    local_rerank: bool = True  # False: favorites and preferences go into the LLM prompt instead
@@ -0,0 +1,169 @@
+"""CPU-bound parsing of downloaded feeds and pages, optionally in a process pool.
+
+Worker functions take raw response bytes and return plain dicts/strings so
+that only lightweight results cross the process boundary.
+"""
+import logging
+from calendar import timegm
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, TypeVar
+
+import feedparser
+from bs4 import BeautifulSoup
+
+from reading_recs.config import PARSE_WORKERS, PARSE_BATCH_SIZE
+
+log = logging.getLogger(__name__)
+
+K = TypeVar("K")
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _run_batch(func: Callable[[T], R], jobs: list[T]) -> list[R]:
+    return [func(job) for job in jobs]
+
+
+def run_iter(func: Callable[[T], R], items: Iterable[tuple[K, T]]) -> Iterator[tuple[K, R]]:
+    """Apply func to (key, job) items as they are produced, yielding (key, result) in order.
+
+    items is typically a generator that downloads as it goes. Jobs are sent to
+    the process pool in batches of PARSE_BATCH_SIZE as soon as a batch is full,
+    and at most PARSE_WORKERS batches are in flight, so only a few batches of
+    raw bytes are held at once however many jobs there are. Fewer jobs than one
+    batch, or PARSE_WORKERS=0 (for debugging), are parsed in-process.
+    """
+    pool = None
+    pending: deque = deque()  # (keys, future) per submitted batch, oldest first
+    keys: list[K] = []
+    jobs: list[T] = []
+    try:
+        for key, job in items:
+            if PARSE_WORKERS == 0:
+                yield key, func(job)
+                continue
+            keys.append(key)
+            jobs.append(job)
+            if len(jobs) < PARSE_BATCH_SIZE:
+                continue
+            if pool is None:
+                pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+            pending.append((keys, pool.submit(_run_batch, func, jobs)))
+            keys, jobs = [], []
+            # Every worker busy: wait for the oldest batch before downloading more
+            while len(pending) > PARSE_WORKERS or (pending and pending[0][1].done()):
+                done_keys, future = pending.popleft()
+                yield from zip(done_keys, future.result())
+
+        if jobs and pool is None:
+            yield from zip(keys, _run_batch(func, jobs))
+        elif jobs:
+            pending.append((keys, pool.submit(_run_batch, func, jobs)))
+        while pending:
+            done_keys, future = pending.popleft()
+            yield from zip(done_keys, future.result())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def _extract_aggregator_links(html: str) -> list[str]:
+    """Extract outbound article URLs from an aggregator entry's HTML summary."""
+    soup = BeautifulSoup(html, "lxml")
+    urls = []
+    for a in soup.find_all("a", href=True):
+        href = a["href"]
+        if href.startswith("http") and "comment" not in href.lower():
+            urls.append(href)
+    return urls
+
+
+def _get_comment_count(entry) -> int:
+    """Extract comment count from RSS entry if available."""
+    # slash:comments (used by many feeds)
+    if hasattr(entry, "slash_comments"):
+        try:
+            return int(entry.slash_comments)
+        except (ValueError, TypeError):
+            pass
+    return 0
+
+
+def _entry_published(entry) -> float | None:
+    """Return entry publish time as a UTC timestamp, or None if unavailable."""
+    t = getattr(entry, "published_parsed", None) or getattr(entry, "updated_parsed", None)
+    if t:
+        return float(timegm(t[:6]))
+    return None
+
+
+def parse_feed(job: tuple[bytes, int, bool, int | None]) -> dict:
+    """Parse a feed body into lightweight entries.
+
+    job is (content, max_entries, is_aggregator, max_chars). Returns
+    {"published": [...], "entries": [...]} or {"error": "..."}; published holds
+    timestamps for every dated entry, for the polling scheduler.
+    """
+    content, max_entries, is_aggregator, max_chars = job
+    try:
+        parsed = feedparser.parse(content)
+
+        entries = []
+        for entry in parsed.entries[:max_entries]:
+            summary = getattr(entry, "summary", "")
+            item = {
+                "link": getattr(entry, "link", None),
+                "title": getattr(entry, "title", None),
+                "published": _entry_published(entry),
+                "comment_count": _get_comment_count(entry),
+                "text": "",
+                "links": [],
+            }
+            if is_aggregator:
+                # For aggregator feeds, linked URLs become separate articles
+                item["links"] = _extract_aggregator_links(summary)
+            elif summary:
+                # Strip HTML from summary
+                item["text"] = BeautifulSoup(summary, "lxml").get_text(separator=" ", strip=True)[:max_chars]
+            entries.append(item)
+
+        published = [p for p in map(_entry_published, parsed.entries) if p is not None]
+    except Exception as e:
+        # One malformed feed must not take down the whole pool map
+        return {"error": str(e)}
+    return {"published": published, "entries": entries}
+
+
+def extract_text(job: tuple[bytes, str | None, int | None]) -> str | None:
+    """Extract article body text from a page. job is (content, encoding, max_chars).
+
+    Returns None when no text is found or the page can't be parsed.
+    """
+    content, encoding, max_chars = job
+    try:
+        return _extract_text(content.decode(encoding or "utf-8", errors="replace"), max_chars)
+    except Exception:
+        return None
+
+
+def _extract_text(html: str, max_chars: int | None) -> str | None:
+    soup = BeautifulSoup(html, "lxml")
+
+    # Try <article>, then largest <div>, then <body>
+    article_tag = soup.find("article")
+    if article_tag:
+        return article_tag.get_text(separator=" ", strip=True)[:max_chars]
+
+    divs = soup.find_all("div")
+    if divs:
+        largest = max(divs, key=lambda d: len(d.get_text()))
+        text = largest.get_text(separator=" ", strip=True)
+        if len(text) > 200:
+            return text[:max_chars]
+
+    body = soup.find("body")
+    if body:
+        return body.get_text(separator=" ", strip=True)[:max_chars]
+
+    return None
@@ -1,23 +1,18 @@
 import logging
 import time
+from typing import Callable
 
-import httpx
-
-from reading_recs import db
+from reading_recs import db, transport
 from reading_recs.models import Article
 
 log = logging.getLogger(__name__)
 
-_client = httpx.Client(timeout=10, follow_redirects=True, headers={
-    "User-Agent": "reading_recs/0.1 (personal RSS aggregator)"
-})
-
-
 def query_hn(url: str) -> dict:
     """Query HN Algolia API for engagement data on a URL."""
     try:
-        resp = _client.get(
+        resp = transport.get(
             "https://hn.algolia.com/api/v1/search",
+            "popularity",
             params={"query": url, "restrictSearchableAttributes": "url", "hitsPerPage": 5},
         )
         resp.raise_for_status()
@@ -45,8 +40,9 @@ def query_reddit(url: str) -> dict:
     if _reddit_blocked:
         return {"comments": 0, "score": 0}
     try:
-        resp = _client.get(
+        resp = transport.get(
             "https://www.reddit.com/search.json",
+            "popularity",
             params={"q": f"url:{url}", "sort": "top", "limit": 5},
         )
         if resp.status_code == 429:
@@ -69,8 +65,11 @@ def query_reddit(url: str) -> dict:
         return {"comments": 0, "score": 0}
 
 
-def enrich(articles: list[Article]) -> list[Article]:
-    """Enrich articles with popularity signals and flag above-average ones."""
+def enrich(articles: list[Article], on_enriched: Callable[[Article], None] | None = None) -> list[Article]:
+    """Enrich articles with popularity signals and flag above-average ones.
+
+    on_enriched is called with each article as soon as it is done, for checkpointing.
+    """
     global _reddit_blocked
     _reddit_blocked = False  # reset per run
 
@@ -93,6 +92,8 @@ def enrich(articles: list[Article]) -> list[Article]:
         article.is_above_average = (
             total_comments > avg_comments or total_score > avg_score
         )
+        if on_enriched:
+            on_enriched(article)
 
         if (i + 1) % 10 == 0:
             log.info("Enriched %d/%d articles", i + 1, len(articles))
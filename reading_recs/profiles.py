@@ -0,0 +1,61 @@
+import logging
+import sys
+import tomllib
+
+from reading_recs import db
+from reading_recs.config import (
+    PROFILES_PATH,
+    ROOT_DIR,
+    GMAIL_TO,
+    FAVORITES_PATH,
+    TOP_SOURCE_BOOST,
+)
+from reading_recs.models import Profile
+
+log = logging.getLogger(__name__)
+
+
+def load_profiles() -> list[Profile]:
+    """Load reader profiles from profiles.toml, or a single default reader from .env.
+
+    profiles.toml holds one [[profile]] table per reader:
+
+        [[profile]]
+        name = "alice"
+        email = "alice@example.com"
+        favorites = "examples/favorites.md"
+        top_boost = 2.0
+        source_boosts = { "Dan Luu" = 1.0, "smitten kitchen" = -3.0 }
+    """
+    if not PROFILES_PATH.exists():
+        return [Profile(
+            name=db.DEFAULT_PROFILE,
+            email=GMAIL_TO,
+            favorites_path=FAVORITES_PATH,
+            top_boost=TOP_SOURCE_BOOST,
+            local_rerank=False,
+        )]
+
+    data = tomllib.loads(PROFILES_PATH.read_text())
+    profiles = []
+    for p in data.get("profile", []):
+        profiles.append(Profile(
+            name=p["name"],
+            email=p["email"],
+            favorites_path=ROOT_DIR / p.get("favorites", "examples/favorites.md"),
+            top_boost=float(p.get("top_boost", TOP_SOURCE_BOOST)),
+            source_boosts={k: float(v) for k, v in p.get("source_boosts", {}).items()},
+        ))
+    if not profiles:
+        sys.exit(f"{PROFILES_PATH} defines no readers — add a [[profile]] table or remove the file")
+    log.info("Loaded %d reader profiles", len(profiles))
+    return profiles
+
+
+def interest_text(profile: Profile) -> str:
+    """A reader's favorites file plus their preference summary, for similarity re-ranking."""
+    text = profile.favorites_path.read_text() if profile.favorites_path.exists() else ""
+    pref = db.get_preference_summary(profile.name)
+    if pref:
+        text += "\n" + pref[0]
+    return text
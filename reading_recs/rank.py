@@ -0,0 +1,93 @@
+import logging
+import re
+import zlib
+
+import numpy as np
+
+from reading_recs.config import RANK_HASH_DIM
+
+log = logging.getLogger(__name__)
+
+_STOPWORDS = {
+    "the", "and", "for", "that", "with", "this", "from", "are", "was", "but", "not", "you",
+    "have", "has", "its", "they", "their", "what", "about", "which", "more", "can", "how",
+    "why", "who", "will", "one", "all", "out", "into", "than", "also", "just", "like",
+}
+
+
+def _words(text: str) -> list[str]:
+    return [w for w in re.findall(r"[a-z]{3,}", text.lower()) if w not in _STOPWORDS]
+
+
+def terms(text: str) -> set[str]:
+    """Distinct significant words of a text, as used for similarity and full-text queries."""
+    return set(_words(text))
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def text_vectors(texts: list[str], dim: int = RANK_HASH_DIM) -> np.ndarray:
+    """L2-normalized hashed term-frequency vectors, one row per text."""
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for word in _words(text):
+            vectors[i, zlib.crc32(word.encode()) % dim] += 1.0
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def select(
+    adjusted: np.ndarray,
+    llm_scores: np.ndarray,
+    sources: list[str],
+    threshold: float,
+    min_count: int,
+    per_source_cap: int,
+    vectors: np.ndarray | None = None,
+    mmr_lambda: float = 0.0,
+) -> list[int]:
+    """Pick digest indices in one greedy top-k pass.
+
+    An article is admissible if its source is under the per-digest cap and it
+    either passes the threshold or the digest is still short of min_count (in
+    which case any LLM-scored article may fill it). Each step takes the
+    admissible article with the best Maximal Marginal Relevance score:
+    adjusted score minus mmr_lambda times its highest similarity to an article
+    already picked. With mmr_lambda=0 this is plain descending adjusted score.
+    """
+    n = len(adjusted)
+    if n == 0:
+        return []
+    _, source_ids = np.unique(np.asarray(sources, dtype=object), return_inverse=True)
+    source_counts = np.zeros(source_ids.max() + 1, dtype=np.int64)
+
+    passing = adjusted >= threshold
+    scored = llm_scores > 0
+    available = passing | scored
+    max_sim = np.zeros(n, dtype=np.float32)
+    use_mmr = mmr_lambda > 0 and vectors is not None
+
+    picked: list[int] = []
+    while True:
+        admissible = available if len(picked) < min_count else available & passing
+        if not admissible.any():
+            break
+        objective = adjusted - mmr_lambda * max_sim if use_mmr else adjusted
+        i = int(np.argmax(np.where(admissible, objective, -np.inf)))
+        picked.append(i)
+        available[i] = False
+
+        source = source_ids[i]
+        source_counts[source] += 1
+        if source_counts[source] >= per_source_cap:
+            capped = available & (source_ids == source)
+            if capped.any():
+                log.debug("  source '%s' reached %d articles; %d more skipped",
+                          sources[i], per_source_cap, int(capped.sum()))
+            available &= source_ids != source
+        if use_mmr:
+            np.maximum(max_sim, vectors @ vectors[i], out=max_sim)
+
+    return picked
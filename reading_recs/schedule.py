@@ -0,0 +1,50 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from statistics import median
+
+from reading_recs import db
+from reading_recs.config import SCHEDULE_MIN_INTERVAL_HOURS, SCHEDULE_MAX_INTERVAL_HOURS
+
+log = logging.getLogger(__name__)
+
+
+def estimate_interval_hours(published: list[datetime]) -> float:
+    """Estimate how long to wait before polling a feed again, from its entry timestamps.
+
+    Polls at half the feed's median gap between posts so a new post is picked up
+    well inside the lookback window. Feeds without enough dated entries fall back
+    to the minimum interval, i.e. they are polled on every run.
+    """
+    times = sorted(published, reverse=True)
+    gaps = [
+        (newer - older).total_seconds() / 3600
+        for newer, older in zip(times, times[1:])
+        if newer > older
+    ]
+    if not gaps:
+        return SCHEDULE_MIN_INTERVAL_HOURS
+    interval = median(gaps) / 2
+    return max(SCHEDULE_MIN_INTERVAL_HOURS, min(SCHEDULE_MAX_INTERVAL_HOURS, interval))
+
+
+def due_feeds(feeds: list[dict], force_all: bool = False) -> list[dict]:
+    """Return the feeds whose next poll time has passed (all feeds if force_all)."""
+    if force_all:
+        return feeds
+    schedule = db.get_feed_schedule()
+    now = datetime.now(timezone.utc)
+    due = []
+    for feed_info in feeds:
+        next_poll = schedule.get(feed_info["url"])
+        if next_poll is None or datetime.fromisoformat(next_poll) <= now:
+            due.append(feed_info)
+    log.info("Scheduler: %d/%d feeds due for polling", len(due), len(feeds))
+    return due
+
+
+def record_poll(feed_url: str, published: list[datetime]):
+    """Store the next poll time for a feed that was just fetched successfully."""
+    interval = estimate_interval_hours(published)
+    now = datetime.now(timezone.utc)
+    next_poll = now + timedelta(hours=interval)
+    db.save_feed_schedule(feed_url, next_poll.isoformat(), interval, now.isoformat())
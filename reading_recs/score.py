@@ -1,25 +1,55 @@
 import json
 import logging
+import math
+import random
 import re
+import time
+from pathlib import Path
+from typing import Callable
 
-import openai
+import numpy as np
 
-from reading_recs import db
+from reading_recs import db, rank
 from reading_recs.config import (
     OPENAI_API_KEY,
-    FAVORITES_PATH,
     LLM_SCORE_THRESHOLD,
     MIN_ARTICLES,
     TOP_SOURCE_BOOST,
     SOURCE_PENALTY_PER_REC,
     SOURCE_PENALTY_LOOKBACK_DAYS,
     MAX_ARTICLES_PER_SOURCE,
+    FEEDBACK_SOURCE_WEIGHT,
+    FAVORITES_SIMILARITY_WEIGHT,
+    RANK_MMR_LAMBDA,
+    TOPIC_REPEAT_PENALTY,
+    TOPIC_REPEAT_LOOKBACK_DAYS,
+    TOPIC_REPEAT_SIMILARITY,
+    LLM_CALL_BUDGET,
+    LLM_TOKEN_BUDGET,
+    CASCADE_TARGET_ARTICLES,
+    CASCADE_CONFIDENCE_MARGIN,
+    SHADOW_SAMPLE_RATE,
+    SHADOW_MODEL,
+    SHADOW_EXCERPT_CHARS,
+    SHADOW_BATCH_SIZE,
 )
-from reading_recs.models import ScoredArticle
+from reading_recs.models import Profile, ScoredArticle
+from reading_recs.profiles import interest_text
+from reading_recs.rank import text_vectors, terms, jaccard
 
 log = logging.getLogger(__name__)
 
-_client = openai.OpenAI(api_key=OPENAI_API_KEY)
+_client = None
+
+
+def _get_client():
+    """Build the OpenAI client on first use; importing openai alone costs a noticeable fraction of startup."""
+    global _client
+    if _client is None:
+        import openai
+
+        _client = openai.OpenAI(api_key=OPENAI_API_KEY)
+    return _client
 
 SYSTEM_PROMPT = """You are a reading recommendation scorer. Given an article's title, source, text excerpt, and popularity context, score it from 1-10 on how worth reading it is.
 
@@ -33,10 +63,10 @@ Respond with ONLY a JSON object: {"score": <1-10>, "summary": "<2 sentences>"}
 The summary is a reader-facing description of what the article covers — write it the same way regardless of your score. Summarize the content in 2 sentences. If there's a genuinely surprising or counterintuitive finding, lead with that; otherwise just describe what the piece covers. Be direct and concrete. Don't start with 'This article' or 'The author'. Never evaluate the article, reference the score, or say whether the reader will like it. Example: 'Gig economy minimum wages backfire by reducing flexibility — Uber data shows drivers earn less overall after wage floors are set. The real beneficiary turns out to be the platform, not workers.'"""
 
 
-def _load_few_shot_examples() -> str:
-    if not FAVORITES_PATH.exists():
+def _load_few_shot_examples(favorites_path: Path) -> str:
+    if not favorites_path.exists():
         return ""
-    content = FAVORITES_PATH.read_text()
+    content = favorites_path.read_text()
     return f"\nHere are examples of articles the user considers high quality (score 9-10):\n\n{content}\n"
 
 
@@ -56,6 +86,10 @@ def _parse_llm_response(text: str) -> dict | None:
     return None
 
 
+# LLM scoring calls and tokens spent this run (shadow calls included), checked against the budget
+_usage = {"calls": 0, "tokens": 0, "prompt_tokens": 0, "shadow_calls": 0, "calls_saved": 0}
+
+
 def score_article(
     article_text: str,
     title: str,
@@ -79,7 +113,8 @@ Text (excerpt):
     user_msg += "\nScore this article."
 
     try:
-        resp = _client.chat.completions.create(
+        _usage["calls"] += 1
+        resp = _get_client().chat.completions.create(
             model="gpt-4o-mini",
             max_tokens=150,
             messages=[
@@ -87,53 +122,119 @@ Text (excerpt):
                 {"role": "user", "content": user_msg},
             ],
         )
+        if resp.usage:
+            _usage["tokens"] += resp.usage.total_tokens
+            _usage["prompt_tokens"] += resp.usage.prompt_tokens
         return _parse_llm_response(resp.choices[0].message.content)
     except Exception as e:
         log.warning("LLM scoring failed for %s: %s", title, e)
         return None
 
 
-def _limit_articles_per_source(
-    articles: list[ScoredArticle],
-    max_articles: int | None = None,
-) -> list[ScoredArticle]:
-    """Return articles in rank order, capped per source for a single digest."""
-    selected: list[ScoredArticle] = []
-    source_counts: dict[str, int] = {}
-
-    for sa in articles:
-        source_count = source_counts.get(sa.article.source, 0)
-        if source_count >= MAX_ARTICLES_PER_SOURCE:
-            log.info(
-                "  %s - skipped (source '%s' already has %d articles in this digest)",
-                sa.article.title[:50],
-                sa.article.source,
-                MAX_ARTICLES_PER_SOURCE,
-            )
-            continue
-
-        selected.append(sa)
-        source_counts[sa.article.source] = source_count + 1
-
-        if max_articles is not None and len(selected) >= max_articles:
-            break
-
-    return selected
-
-
-def score_and_select(candidates: list[ScoredArticle]) -> list[ScoredArticle]:
-    """Score candidates with LLM, select top articles for digest."""
-    few_shot = _load_few_shot_examples()
+def _over_budget() -> bool:
+    return _usage["calls"] >= LLM_CALL_BUDGET or _usage["tokens"] >= LLM_TOKEN_BUDGET
+
+
+def llm_metrics() -> dict[str, int]:
+    """The run's LLM usage so far, including any spent before a resume, keyed by runs column."""
+    return {
+        "llm_calls": _usage["calls"],
+        "llm_tokens": _usage["tokens"],
+        "llm_calls_saved": _usage["calls_saved"],
+        "shadow_calls": _usage["shadow_calls"],
+    }
+
+
+def prescore(candidates: list[ScoredArticle]) -> np.ndarray:
+    """Cheap local estimate of how likely each candidate is to score well, from signals already fetched."""
+    feed_stats = db.get_all_feed_stats()
+    avg_scores = np.array([feed_stats.get(sa.article.source, (0.0, 0.0, 0))[1] for sa in candidates], dtype=np.float64)
+    comments = np.array([sa.article.comment_count for sa in candidates], dtype=np.float64)
+    text_len = np.array([len(sa.article.text) for sa in candidates], dtype=np.float64)
+    is_top = np.array([sa.article.source_section == "top" for sa in candidates], dtype=np.float64)
+    above_avg = np.array([sa.article.is_above_average for sa in candidates], dtype=np.float64)
+    limited = np.array([sa.article.limited_data for sa in candidates], dtype=np.float64)
+    return (
+        TOP_SOURCE_BOOST * is_top
+        + 1.0 * above_avg
+        + 0.3 * np.log1p(comments)
+        + 0.2 * np.log1p(avg_scores)
+        + 0.2 * np.log1p(text_len)
+        - 2.0 * limited
+    )
+
+
+def score_candidates(
+    candidates: list[ScoredArticle],
+    profile: Profile | None = None,
+    scored_urls: set[str] = frozenset(),
+    on_scored: Callable[[ScoredArticle], None] | None = None,
+    spent: dict[str, int] | None = None,
+    readers: list[Profile] = (),
+):
+    """Score candidates with the LLM, in place, as a budgeted cascade.
+
+    Candidates are scored in descending pre-score order until the call/token
+    budget runs out or enough articles are confidently above threshold to fill
+    a digest; the rest keep llm_score 0. With a profile, its favorites and
+    preference summary personalize the prompt. Without one the score is
+    profile-independent, so it can be shared by every reader.
+
+    Candidates in scored_urls already carry a score from a checkpoint and are
+    not sent again; on_scored is called with each newly scored candidate.
+    spent holds the LLM usage a resumed run recorded before (llm_metrics()
+    keys); it counts against the budget, which is per run, not per process.
+
+    An article only counts as confidently above threshold if it stays there
+    after every reader's re-rank penalties and (non-negative) boosts, so the
+    early stop can't leave a digest short once penalties are applied.
+    """
+    few_shot = _load_few_shot_examples(profile.favorites_path) if profile else ""
 
     # Load preference summary if available
     preference_context = ""
-    pref = db.get_preference_summary()
+    pref = db.get_preference_summary(profile.name) if profile else None
     if pref:
         summary, count = pref
         preference_context = f"\nUser preference profile (based on {count} ratings):\n{summary}\n"
         log.info("Using preference profile (%d ratings)", count)
 
-    for sa in candidates:
+    spent = spent or {}
+    _usage.update(calls=spent.get("llm_calls", 0), tokens=spent.get("llm_tokens", 0), prompt_tokens=0,
+                  shadow_calls=spent.get("shadow_calls", 0), calls_saved=0)
+    if _usage["calls"]:
+        log.info("Resuming with %d LLM calls and %d tokens already spent this run", _usage["calls"], _usage["tokens"])
+    call_metrics: dict[str, tuple[float, int]] = {}
+    confident_per_source: dict[str, int] = {}
+    # Readers' boosts and penalties don't depend on the LLM score, so they are known up front;
+    # the favorites similarity boost needs vectors but is never negative, so leaving it out is safe
+    adjustments = [_adjustments(candidates, p, scored_only=False)[:2] for p in readers if candidates]
+    boosts = np.array([b for b, _ in adjustments]).reshape(-1, len(candidates))
+    penalties = np.array([p for _, p in adjustments]).reshape(-1, len(candidates))
+
+    def is_confident(i: int) -> bool:
+        adjusted = np.minimum(10.0, candidates[i].llm_score + boosts[:, i]) - penalties[:, i]
+        floor = adjusted.min() if len(adjusted) else candidates[i].llm_score
+        return floor >= LLM_SCORE_THRESHOLD + CASCADE_CONFIDENCE_MARGIN
+
+    stop_reason = "all candidates scored"
+    order = np.argsort(-prescore(candidates), kind="stable") if candidates else []
+
+    for i in order:
+        if _over_budget():
+            stop_reason = "budget exhausted"
+            break
+        confident = sum(min(c, MAX_ARTICLES_PER_SOURCE) for c in confident_per_source.values())
+        if confident >= CASCADE_TARGET_ARTICLES:
+            stop_reason = f"{confident} articles confidently above threshold"
+            break
+
+        sa = candidates[i]
+        if sa.article.url in scored_urls:
+            if is_confident(i):
+                confident_per_source[sa.article.source] = confident_per_source.get(sa.article.source, 0) + 1
+            continue
+
         popularity_ctx = (
             f"{'Above' if sa.article.is_above_average else 'Below'} average engagement for {sa.article.source}. "
             f"{sa.article.comment_count} comments."
@@ -141,38 +242,250 @@ def score_and_select(candidates: list[ScoredArticle]) -> list[ScoredArticle]:
         if sa.article.limited_data:
             popularity_ctx += " (Limited text data — full article could not be fetched.)"
 
+        start, prompt_tokens = time.perf_counter(), _usage["prompt_tokens"]
         result = score_article(
             sa.article.text, sa.article.title, sa.article.source, popularity_ctx, few_shot, preference_context,
         )
+        call_metrics[sa.article.url] = ((time.perf_counter() - start) * 1000, _usage["prompt_tokens"] - prompt_tokens)
         if result:
             sa.llm_score = result["score"]
             sa.summary = result["summary"]
             log.info("  %s — score: %d, summary: %s", sa.article.title[:50], sa.llm_score, sa.summary)
+            if is_confident(i):
+                confident_per_source[sa.article.source] = confident_per_source.get(sa.article.source, 0) + 1
+            # Failed calls are not checkpointed, so a resumed run retries them
+            if on_scored:
+                on_scored(sa)
+
+    _usage["calls_saved"] = len(candidates) - (_usage["calls"] - _usage["shadow_calls"])
+    log.info("LLM cascade: %d calls, %d tokens for %d candidates (%d calls saved vs full scoring; stopped: %s)",
+             _usage["calls"], _usage["tokens"], len(candidates), _usage["calls_saved"], stop_reason)
 
-    # Apply source variety penalty based on recent recommendation history
-    source_counts = db.get_recent_source_counts(SOURCE_PENALTY_LOOKBACK_DAYS)
-    for sa in candidates:
-        count = source_counts.get(sa.article.source, 0)
-        penalty = SOURCE_PENALTY_PER_REC * count
-        boost = TOP_SOURCE_BOOST if sa.article.source_section == "top" else 0.0
-        sa.adjusted_score = min(10.0, sa.llm_score + boost) - penalty
-        if boost > 0:
-            log.info("  %s - boost +%.1f (source '%s' is in top section)",
-                     sa.article.title[:50], boost, sa.article.source)
-        if penalty > 0:
-            log.info("  %s — penalty %.1f (source '%s' recommended %d times in last %d days)",
-                     sa.article.title[:50], penalty, sa.article.source, count, SOURCE_PENALTY_LOOKBACK_DAYS)
-
-    # Select: adjusted_score >= threshold, floor at MIN, no overall cap.
-    # Enforce a per-digest source cap so one prolific feed cannot dominate.
-    passing = [sa for sa in candidates if sa.adjusted_score >= LLM_SCORE_THRESHOLD]
-    passing.sort(key=lambda s: s.adjusted_score, reverse=True)
-    selected = _limit_articles_per_source(passing)
-
-    if len(selected) < MIN_ARTICLES:
-        # Fall back to top by adjusted score while preserving the source cap.
-        all_scored = [sa for sa in candidates if sa.llm_score > 0]
-        all_scored.sort(key=lambda s: s.adjusted_score, reverse=True)
-        selected = _limit_articles_per_source(all_scored, MIN_ARTICLES)
-
-    return selected
+    if SHADOW_SAMPLE_RATE > 0:
+        shadow_score(candidates, call_metrics)
+
+
+SHADOW_SYSTEM_PROMPT = """You are a reading recommendation scorer. For each article below (title, source, text excerpt), score from 1-10 how worth reading it is.
+
+Criteria:
+- Opinionated — not just factual news
+- Info-dense — packed with insights, not padded
+- Differentiated — unique perspective, not a generic take
+- Topically biased toward (but not limited to): economics, AI, data science, technology, business strategy, public policy
+
+Respond with ONLY a JSON array: [{"id": <article id>, "score": <1-10>}, ...]"""
+
+
+def _rankdata(values: np.ndarray) -> np.ndarray:
+    """Ranks with ties averaged, as used by Spearman correlation."""
+    order = np.argsort(values, kind="stable")
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[order] = np.arange(1, len(values) + 1)
+    for v in np.unique(values):
+        tied = values == v
+        ranks[tied] = ranks[tied].mean()
+    return ranks
+
+
+def _spearman(a: np.ndarray, b: np.ndarray) -> float | None:
+    if len(a) < 3:
+        return None
+    ra, rb = _rankdata(a), _rankdata(b)
+    if ra.std() == 0 or rb.std() == 0:
+        return None
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+def _shadow_batch(batch: list[ScoredArticle]) -> tuple[dict[int, float], float, int]:
+    """Score a batch with the shadow configuration. Returns (scores by index, latency ms, prompt tokens)."""
+    user_msg = "\n\n".join(
+        f"[id {i}] Title: {sa.article.title}\nSource: {sa.article.source}\n"
+        f"Text (excerpt):\n{sa.article.text[:SHADOW_EXCERPT_CHARS]}"
+        for i, sa in enumerate(batch)
+    )
+    start = time.perf_counter()
+    _usage["calls"] += 1
+    _usage["shadow_calls"] += 1
+    resp = _get_client().chat.completions.create(
+        model=SHADOW_MODEL,
+        max_tokens=20 * len(batch) + 20,
+        messages=[
+            {"role": "system", "content": SHADOW_SYSTEM_PROMPT},
+            {"role": "user", "content": user_msg},
+        ],
+    )
+    latency = (time.perf_counter() - start) * 1000
+    if resp.usage:
+        _usage["tokens"] += resp.usage.total_tokens
+        _usage["prompt_tokens"] += resp.usage.prompt_tokens
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", resp.choices[0].message.content.strip())
+    scores = {int(item["id"]): float(item["score"]) for item in json.loads(text)}
+    return scores, latency, resp.usage.prompt_tokens if resp.usage else 0
+
+
+def shadow_score(candidates: list[ScoredArticle], call_metrics: dict[str, tuple[float, int]]):
+    """Score a sample of this run's LLM-scored candidates with the shadow configuration.
+
+    Per-article latency and prompt tokens for both scorers, threshold agreement
+    and the run's rank correlation go into validation_log for offline comparison.
+    Batched shadow calls have their latency and tokens split evenly per article.
+    They count against the run's LLM_CALL_BUDGET and LLM_TOKEN_BUDGET like
+    production calls, so shadowing stops wherever the budget runs out.
+    """
+    pool = [sa for sa in candidates if sa.article.url in call_metrics and sa.llm_score > 0]
+    k = min(len(pool), math.ceil(SHADOW_SAMPLE_RATE * len(pool)))
+    if k == 0:
+        return
+    sample = random.sample(pool, k)
+
+    rows = []
+    for start in range(0, len(sample), SHADOW_BATCH_SIZE):
+        if _over_budget():
+            log.info("Shadow scoring stopped after %d of %d articles: budget exhausted", start, len(sample))
+            break
+        batch = sample[start:start + SHADOW_BATCH_SIZE]
+        try:
+            scores, latency, prompt_tokens = _shadow_batch(batch)
+        except Exception as e:
+            log.warning("Shadow scoring failed for a batch of %d: %s", len(batch), e)
+            continue
+        for i, sa in enumerate(batch):
+            if i not in scores:
+                continue
+            prod_latency, prod_tokens = call_metrics[sa.article.url]
+            rows.append({
+                "url": sa.article.url,
+                "llm_score": sa.llm_score,
+                "shadow_score": scores[i],
+                "latency_ms": prod_latency,
+                "shadow_latency_ms": latency / len(batch),
+                "prompt_tokens": prod_tokens,
+                "shadow_prompt_tokens": prompt_tokens / len(batch),
+                "agrees": (sa.llm_score >= LLM_SCORE_THRESHOLD) == (scores[i] >= LLM_SCORE_THRESHOLD),
+            })
+    if not rows:
+        return
+
+    rank_corr = _spearman(
+        np.array([r["llm_score"] for r in rows]), np.array([r["shadow_score"] for r in rows]),
+    )
+    db.save_validation_rows(rows, SHADOW_MODEL, rank_corr)
+    log.info(
+        "Shadow %s on %d articles: threshold agreement %.0f%%, rank correlation %s, "
+        "avg latency %.0f → %.0f ms, avg prompt tokens %.0f → %.0f",
+        SHADOW_MODEL, len(rows), 100 * sum(r["agrees"] for r in rows) / len(rows),
+        "n/a" if rank_corr is None else f"{rank_corr:.2f}",
+        sum(r["latency_ms"] for r in rows) / len(rows), sum(r["shadow_latency_ms"] for r in rows) / len(rows),
+        sum(r["prompt_tokens"] for r in rows) / len(rows), sum(r["shadow_prompt_tokens"] for r in rows) / len(rows),
+    )
+
+
+def _topic_repeats(candidates: list[ScoredArticle], profile: Profile, scored_only: bool = True) -> np.ndarray:
+    """Flag candidates (LLM-scored ones only, by default) whose title closely overlaps one recently recommended to this reader."""
+    repeats = np.zeros(len(candidates), dtype=bool)
+    if TOPIC_REPEAT_PENALTY <= 0:
+        return repeats
+    queries = {i: terms(sa.article.title) for i, sa in enumerate(candidates) if sa.llm_score > 0 or not scored_only}
+    recent = db.find_recent_recommended_matches(set().union(*queries.values()), TOPIC_REPEAT_LOOKBACK_DAYS, profile.name)
+    recent_terms = [(url, title, terms(title)) for url, title in recent.items()]
+    for i, words in queries.items():
+        for url, title, past in recent_terms:
+            if url != candidates[i].article.url and jaccard(words, past) >= TOPIC_REPEAT_SIMILARITY:
+                log.debug("  topic repeat: %s ~ %s", candidates[i].article.title, title)
+                repeats[i] = True
+                break
+    return repeats
+
+
+def rerank(
+    candidates: list[ScoredArticle],
+    profile: Profile,
+    vectors: np.ndarray | None = None,
+) -> list[ScoredArticle]:
+    """Copy the shared scored candidates and apply one reader's boosts and penalties in bulk."""
+    previously_recommended = db.get_previously_recommended(profile.name)
+    keep = [i for i, sa in enumerate(candidates) if sa.article.url not in previously_recommended]
+    if not keep:
+        return []
+    candidates = [candidates[i] for i in keep]
+    if vectors is not None:
+        vectors = vectors[keep]
+
+    llm_scores = np.array([sa.llm_score for sa in candidates], dtype=np.float64)
+    boosts, penalties, repeats = _adjustments(candidates, profile, vectors)
+    adjusted = np.minimum(10.0, llm_scores + boosts) - penalties
+
+    log.info("[%s] Re-ranked %d candidates: %d boosted, %d penalized for recent recommendations (%d topic repeats)",
+             profile.name, len(candidates), int((boosts != 0).sum()), int((penalties > 0).sum()), int(repeats.sum()))
+    ranked = []
+    for sa, score in zip(candidates, adjusted.tolist()):
+        ranked.append(ScoredArticle(article=sa.article, llm_score=sa.llm_score, summary=sa.summary, adjusted_score=score))
+    return ranked
+
+
+def _adjustments(
+    candidates: list[ScoredArticle],
+    profile: Profile,
+    vectors: np.ndarray | None = None,
+    scored_only: bool = True,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """One reader's (boosts, penalties, topic repeats) per candidate; adjusted = min(10, llm + boosts) - penalties."""
+    sources = [sa.article.source for sa in candidates]
+    unique_sources, source_index = np.unique(np.asarray(sources, dtype=object), return_inverse=True)
+    is_top = np.array([sa.article.source_section == "top" for sa in candidates])
+
+    # Per-source terms are looked up once per distinct source, then broadcast
+    source_counts = db.get_recent_source_counts(SOURCE_PENALTY_LOOKBACK_DAYS, profile.name)
+    rec_counts = np.array([source_counts.get(src, 0) for src in unique_sources], dtype=np.float64)
+    source_boost = np.array([profile.source_boosts.get(src, 0.0) for src in unique_sources])
+    if profile.local_rerank:
+        source_feedback = db.get_source_feedback(profile.name)
+        votes = np.array([source_feedback.get(src, (0, 0)) for src in unique_sources], dtype=np.float64).reshape(-1, 2)
+        source_boost += FEEDBACK_SOURCE_WEIGHT * (votes[:, 0] - votes[:, 1]) / (votes.sum(axis=1) + 2)
+
+    penalties = SOURCE_PENALTY_PER_REC * rec_counts[source_index]
+    repeats = _topic_repeats(candidates, profile, scored_only)
+    penalties += TOPIC_REPEAT_PENALTY * repeats
+    boosts = np.where(is_top, profile.top_boost, 0.0) + source_boost[source_index]
+    if profile.local_rerank and vectors is not None:
+        interests = text_vectors([interest_text(profile)])[0]
+        boosts += FAVORITES_SIMILARITY_WEIGHT * (vectors @ interests)
+    return boosts, penalties, repeats
+
+
+def select(ranked: list[ScoredArticle], vectors: np.ndarray | None = None) -> list[ScoredArticle]:
+    """Select one digest: adjusted_score >= threshold, floor at MIN, no overall cap.
+
+    A per-digest source cap stops one prolific feed from dominating, and an
+    optional MMR term (RANK_MMR_LAMBDA) trades score for topic diversity.
+    """
+    picked = rank.select(
+        np.array([sa.adjusted_score for sa in ranked], dtype=np.float64),
+        np.array([sa.llm_score for sa in ranked], dtype=np.float64),
+        [sa.article.source for sa in ranked],
+        LLM_SCORE_THRESHOLD,
+        MIN_ARTICLES,
+        MAX_ARTICLES_PER_SOURCE,
+        vectors,
+        RANK_MMR_LAMBDA,
+    )
+    return [ranked[i] for i in picked]
+
+
+def select_for_profiles(candidates: list[ScoredArticle], profiles: list[Profile]) -> dict[str, list[ScoredArticle]]:
+    """Re-rank the shared scored candidates for each reader and select their digests."""
+    vectors = None
+    if RANK_MMR_LAMBDA > 0 or any(p.local_rerank for p in profiles):
+        vectors = rank.text_vectors([
+            f"{sa.article.title} {sa.summary} {sa.article.text[:1000]}" for sa in candidates
+        ])
+
+    selections = {}
+    for p in profiles:
+        ranked = rerank(candidates, p, vectors)
+        ranked_vectors = None
+        if vectors is not None:
+            index = {sa.article.url: i for i, sa in enumerate(candidates)}
+            ranked_vectors = vectors[[index[sa.article.url] for sa in ranked]]
+        selections[p.name] = select(ranked, ranked_vectors)
+    return selections
@@ -0,0 +1,155 @@
+"""One pooled HTTP client shared by fetch, popularity and feedback.
+
+Requests name a purpose ("feed", "page", "popularity", "kv") which picks the
+timeout and default headers, while connections, keep-alive and DNS lookups
+are shared across all of them.
+"""
+import logging
+import socket
+import threading
+import time
+
+import httpcore
+import httpx
+
+from reading_recs.config import HTTP_MAX_CONNECTIONS, HTTP2_ENABLED, DNS_CACHE_TTL
+
+log = logging.getLogger(__name__)
+
+_FEED_UA = "python-feedparser/6.0.8 +https://github.com/kurtmckee/feedparser"
+
+PURPOSES = {
+    "feed": {"timeout": 15.0, "headers": {"User-Agent": _FEED_UA}},
+    "page": {"timeout": 15.0, "headers": {"User-Agent": _FEED_UA}},
+    "popularity": {"timeout": 10.0, "headers": {"User-Agent": "reading_recs/0.1 (personal RSS aggregator)"}},
+    "kv": {"timeout": 30.0, "headers": {}},
+}
+
+_client: httpx.Client | None = None
+_stats = {"requests": 0, "connections": 0}
+_reported = dict(_stats)  # counts already handed out by http_metrics()
+
+_dns_cache: dict[tuple[str, int], tuple[float, list[str]]] = {}
+_dns_lock = threading.Lock()  # feedback sync resolves from several threads
+
+
+def _resolve(host: str, port: int) -> list[str]:
+    """Addresses for host, cached for DNS_CACHE_TTL seconds; expired entries are dropped on each lookup."""
+    now = time.monotonic()
+    with _dns_lock:
+        hit = _dns_cache.get((host, port))
+        if hit and hit[0] > now:
+            return hit[1]
+        for key in [k for k, (expires, _) in _dns_cache.items() if expires <= now]:
+            del _dns_cache[key]
+    # Resolved outside the lock so a slow lookup doesn't hold up other hosts
+    addresses = list(dict.fromkeys(info[4][0] for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)))
+    with _dns_lock:
+        _dns_cache[(host, port)] = (now + DNS_CACHE_TTL, addresses)
+    return addresses
+
+
+class _CachingBackend(httpcore.SyncBackend):
+    """Network backend that connects via cached DNS results; TLS still verifies the original hostname."""
+
+    def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        try:
+            addresses = _resolve(host, port)
+        except OSError as e:
+            raise httpcore.ConnectError(str(e)) from e
+        error = None
+        for address in addresses:
+            try:
+                return super().connect_tcp(address, port, timeout, local_address, socket_options)
+            except httpcore.ConnectError as e:
+                error = e
+        # Every cached address failed; resolve afresh next time
+        with _dns_lock:
+            _dns_cache.pop((host, port), None)
+        raise error
+
+
+def _trace(event_name: str, info: dict):
+    if event_name == "connection.connect_tcp.complete":
+        _stats["connections"] += 1
+
+
+class _CountingTransport(httpx.HTTPTransport):
+    """Counts requests and new TCP connections so connection reuse can be reported."""
+
+    def __init__(self, http2: bool, limits: httpx.Limits):
+        super().__init__(http2=http2, limits=limits)
+        # httpx doesn't take a network backend, so replace its pool with one built on ours;
+        # handle_request sends through self._pool (httpx is pinned to a minor version for this)
+        self._pool = httpcore.ConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            network_backend=_CachingBackend(),
+        )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        _stats["requests"] += 1
+        request.extensions = {**request.extensions, "trace": _trace}
+        return super().handle_request(request)
+
+
+def get_client() -> httpx.Client:
+    global _client
+    if _client is None:
+        http2 = HTTP2_ENABLED
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                log.warning("HTTP2_ENABLED is set but the h2 package is not installed — using HTTP/1.1")
+                http2 = False
+        _client = httpx.Client(
+            follow_redirects=True,
+            transport=_CountingTransport(
+                http2=http2,
+                limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, keepalive_expiry=30.0),
+            ),
+        )
+    return _client
+
+
+def _options(purpose: str, kwargs: dict) -> dict:
+    profile = PURPOSES[purpose]
+    return {
+        **kwargs,
+        "timeout": kwargs.get("timeout", profile["timeout"]),
+        "headers": {**profile["headers"], **kwargs.get("headers", {})},
+    }
+
+
+def get(url: str, purpose: str, **kwargs) -> httpx.Response:
+    return get_client().get(url, **_options(purpose, kwargs))
+
+
+def put(url: str, purpose: str, **kwargs) -> httpx.Response:
+    return get_client().put(url, **_options(purpose, kwargs))
+
+
+def stream(method: str, url: str, purpose: str, **kwargs):
+    """Context manager yielding a streamed httpx.Response."""
+    return get_client().stream(method, url, **_options(purpose, kwargs))
+
+
+def http_metrics() -> dict[str, int]:
+    """Requests and new connections since the previous call, keyed by runs column."""
+    metrics = {f"http_{k}": _stats[k] - _reported[k] for k in _stats}
+    _reported.update(_stats)
+    return metrics
+
+
+def log_stats():
+    requests, connections = _stats["requests"], _stats["connections"]
+    if not requests:
+        return
+    reused = max(0, requests - connections)
+    log.info("HTTP: %d requests over %d new connections (%.0f%% reused)",
+             requests, connections, 100 * reused / requests)
@@ -0,0 +1,12 @@
+import pytest
+
+from reading_recs import db
+
+
+@pytest.fixture
+def tmp_db(tmp_path, monkeypatch):
+    """A fresh, initialized database under tmp_path in place of data/reading_recs.db."""
+    monkeypatch.setattr(db, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "test.db")
+    db.init_db()
+    return db.DB_PATH
@@ -0,0 +1,84 @@
+"""Incremental columnar export: watermarks, per-run tables, and rowids renumbered under the watermark."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from reading_recs import db, export  # noqa: E402
+from reading_recs.models import Article, ScoredArticle  # noqa: E402
+
+
+def _save(*urls: str, score: float = 5.0):
+    db.save_articles([ScoredArticle(Article(url, f"Title {url}", "Example", "text"), score) for url in urls], set())
+
+
+def _rows(out_dir, table: str) -> list[dict]:
+    rows = []
+    for path in sorted((out_dir / table).glob("*.parquet")):
+        rows += pq.read_table(path).to_pylist()
+    return rows
+
+
+class _Clock:
+    """Stands in for export.datetime, a second apart per call, since files are named by the second."""
+
+    def __init__(self):
+        self.now_ = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+    def now(self, tz=None):
+        self.now_ += timedelta(seconds=1)
+        return self.now_
+
+
+@pytest.fixture
+def out_dir(tmp_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "datetime", _Clock())
+    return tmp_path / "export"
+
+
+def test_exports_only_rows_changed_since_last_time(out_dir):
+    _save("a", "b", "c")
+    assert export.export(out_dir=out_dir)["articles"] == 3
+
+    assert export.export(out_dir=out_dir)["articles"] == 0
+    assert len(list((out_dir / "articles").iterdir())) == 1  # no empty files
+
+    _save("b", score=9.0)
+    _save("d")
+    assert export.export(out_dir=out_dir)["articles"] == 2
+    latest = {}
+    for row in _rows(out_dir, "articles"):
+        latest[row["url"]] = row["llm_score"]
+    assert latest == {"a": 5.0, "b": 9.0, "c": 5.0, "d": 5.0}
+
+
+def test_full_export_ignores_watermarks(out_dir):
+    _save("a", "b")
+    export.export(out_dir=out_dir)
+    assert export.export(full=True, out_dir=out_dir)["articles"] == 2
+
+
+def test_run_tables_wait_for_the_run_to_finish(out_dir):
+    run_id = db.start_run()
+    db.save_run_articles(run_id, [Article("a", "A", "Example", "text")])
+    db.add_run_metrics(run_id, {"llm_calls": 7, "http_requests": 3})
+    assert "runs" not in export.export(out_dir=out_dir)  # no finished run yet
+
+    db.set_run_stage(run_id, "send", finished=True)
+    counts = export.export(out_dir=out_dir)
+    assert (counts["runs"], counts["run_articles"]) == (1, 1)
+    (run,) = _rows(out_dir, "runs")
+    assert (run["run_id"], run["llm_calls"], run["http_requests"]) == (run_id, 7, 3)
+    assert export.export(out_dir=out_dir)["runs"] == 0
+
+
+def test_renumbered_rowids_trigger_a_full_table_export(out_dir, caplog):
+    _save("a", "b", "c")
+    export.export(out_dir=out_dir)
+    # As after a VACUUM that compacted rowids: every rowid now sits below the saved watermark
+    db.save_export_watermarks({"articles": 100})
+    assert export.export(out_dir=out_dir)["articles"] == 3
+    assert "renumbered" in caplog.text
+    assert db.get_export_watermarks()["articles"] == "3"
@@ -0,0 +1,112 @@
+"""Feedback sync against an in-process stand-in for the Cloudflare KV REST API."""
+import json
+import sqlite3
+from urllib.parse import unquote
+
+import httpx
+import pytest
+
+from reading_recs import db, feedback, transport
+
+N_KEYS = 20_000
+PAGE_SIZE = 1000
+
+
+class FakeKV:
+    """Serves the KV list (cursor-paged, with metadata) and value endpoints, counting requests."""
+
+    def __init__(self):
+        self.values: dict[str, dict] = {}
+        self.list_requests = 0
+        self.value_requests = 0
+
+    def put_vote(self, digest_id: str, n: int, thumbs_up: bool):
+        self.values[f"feedback:{digest_id}:{n:08x}"] = {
+            "url": f"https://example.com/{digest_id}/{n}",
+            "title": f"Article {n}",
+            "source": "Example",
+            "thumbs_up": thumbs_up,
+            "digest_date": "2026-10-01",
+        }
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("/keys"):
+            self.list_requests += 1
+            prefix = request.url.params.get("prefix", "")
+            limit = int(request.url.params.get("limit", 1000))
+            start = int(request.url.params.get("cursor") or 0)
+            names = sorted(k for k in self.values if k.startswith(prefix))
+            page = names[start:start + limit]
+            cursor = str(start + limit) if start + limit < len(names) else ""
+            return httpx.Response(200, json={
+                "result": [{"name": k, "metadata": {"thumbs_up": self.values[k]["thumbs_up"]}} for k in page],
+                "result_info": {"count": len(page), "cursor": cursor},
+            })
+        key = unquote(path.rsplit("/values/", 1)[1])
+        self.value_requests += 1
+        if key not in self.values:
+            return httpx.Response(404)
+        return httpx.Response(200, content=json.dumps(self.values[key]))
+
+
+@pytest.fixture
+def kv(tmp_db, monkeypatch):
+    fake = FakeKV()
+    monkeypatch.setattr(transport, "_client", httpx.Client(transport=httpx.MockTransport(fake.handler)))
+    monkeypatch.setattr(feedback, "CLOUDFLARE_API_TOKEN", "token")
+    monkeypatch.setattr(feedback, "CLOUDFLARE_ACCOUNT_ID", "account")
+    monkeypatch.setattr(feedback, "CLOUDFLARE_KV_NAMESPACE_ID", "namespace")
+    monkeypatch.setattr(feedback, "KV_LIST_PAGE_SIZE", PAGE_SIZE)
+    return fake
+
+
+def _feedback_rows() -> dict[str, int]:
+    conn = db.get_conn()
+    rows = dict(conn.execute("SELECT url, thumbs_up FROM feedback").fetchall())
+    conn.close()
+    return rows
+
+
+def test_sync_pages_through_all_keys_then_reads_only_changes(kv):
+    for n in range(N_KEYS):
+        kv.put_vote("d1", n, thumbs_up=n % 3 != 0)
+
+    feedback.sync_feedback()
+    assert kv.list_requests == N_KEYS // PAGE_SIZE
+    assert kv.value_requests == N_KEYS
+    rows = _feedback_rows()
+    assert len(rows) == N_KEYS
+    assert rows["https://example.com/d1/3"] == 0
+
+    # 50 new votes and 10 changed ones; everything else is already synced
+    for n in range(N_KEYS, N_KEYS + 50):
+        kv.put_vote("d2", n, thumbs_up=True)
+    for n in range(0, 30, 3):
+        kv.put_vote("d1", n, thumbs_up=True)
+    kv.list_requests = kv.value_requests = 0
+
+    feedback.sync_feedback()
+    assert kv.value_requests == 60
+    rows = _feedback_rows()
+    assert len(rows) == N_KEYS + 50
+    assert rows["https://example.com/d1/3"] == 1
+
+    kv.value_requests = 0
+    feedback.sync_feedback()
+    assert kv.value_requests == 0
+
+
+def test_sync_writes_feedback_and_synced_keys_in_one_transaction(kv):
+    for n in range(100):
+        kv.put_vote("d1", n, thumbs_up=True)
+    # Fail the second write of the batch; the feedback rows must roll back with it
+    conn = db.get_conn()
+    conn.execute("CREATE TRIGGER fail_synced_keys BEFORE INSERT ON kv_synced_keys BEGIN SELECT RAISE(ABORT, 'boom'); END")
+    conn.commit()
+    conn.close()
+
+    with pytest.raises(sqlite3.IntegrityError, match="boom"):
+        feedback.sync_feedback()
+    assert _feedback_rows() == {}
+    assert kv.value_requests == 100
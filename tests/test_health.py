@@ -0,0 +1,101 @@
+"""Circuit breaker transitions for failing feeds and hosts, stored in SQLite."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from reading_recs import db, health
+
+KEY = health.feed_key("https://example.com/feed.xml")
+
+
+@pytest.fixture(autouse=True)
+def fresh_trials(tmp_db, monkeypatch):
+    monkeypatch.setattr(health, "_trials", set())
+
+
+def _fail(times: int):
+    for _ in range(times):
+        health.record_failure(KEY, "HTTP 503")
+
+
+def _expire_cooldown():
+    row = db.get_circuit(KEY)
+    past = (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()
+    db.save_circuit(KEY, row["state"], row["consecutive_failures"], past, row["last_error"])
+
+
+def _cooldown_left() -> timedelta:
+    return datetime.fromisoformat(db.get_circuit(KEY)["open_until"]) - datetime.now(timezone.utc)
+
+
+def test_stays_closed_below_threshold():
+    _fail(health.CIRCUIT_FAILURE_THRESHOLD - 1)
+    assert db.get_circuit(KEY)["state"] == health.CLOSED
+    assert health.allow(KEY)
+
+
+def test_opens_at_threshold_and_blocks_until_cooldown_ends():
+    _fail(health.CIRCUIT_FAILURE_THRESHOLD)
+    assert db.get_circuit(KEY)["state"] == health.OPEN
+    assert not health.allow(KEY)
+    assert _cooldown_left() > health._cooldown(health.CIRCUIT_FAILURE_THRESHOLD) - timedelta(minutes=1)
+
+
+def test_half_open_lets_one_trial_through_per_run():
+    _fail(health.CIRCUIT_FAILURE_THRESHOLD)
+    _expire_cooldown()
+    assert health.allow(KEY)
+    assert db.get_circuit(KEY)["state"] == health.HALF_OPEN
+    assert not health.allow(KEY)  # the trial is still in flight
+
+    health._trials.clear()  # next run
+    assert health.allow(KEY)
+
+
+def test_successful_trial_closes_the_circuit():
+    _fail(health.CIRCUIT_FAILURE_THRESHOLD)
+    _expire_cooldown()
+    assert health.allow(KEY)
+    health.record_success(KEY)
+    row = db.get_circuit(KEY)
+    assert (row["state"], row["consecutive_failures"]) == (health.CLOSED, 0)
+    assert health.allow(KEY) and health.allow(KEY)
+
+
+def test_failed_trial_reopens_with_a_longer_cooldown():
+    _fail(health.CIRCUIT_FAILURE_THRESHOLD)
+    first = _cooldown_left()
+    _expire_cooldown()
+    assert health.allow(KEY)
+    health.record_failure(KEY, "timeout")
+    row = db.get_circuit(KEY)
+    assert (row["state"], row["consecutive_failures"], row["last_error"]) == (health.OPEN, health.CIRCUIT_FAILURE_THRESHOLD + 1, "timeout")
+    assert _cooldown_left() > 1.9 * first
+    assert not health.allow(KEY)
+
+
+def test_cooldown_doubles_up_to_the_cap():
+    base = timedelta(hours=health.CIRCUIT_BASE_COOLDOWN_HOURS)
+    threshold = health.CIRCUIT_FAILURE_THRESHOLD
+    assert health._cooldown(threshold) == base
+    assert health._cooldown(threshold + 1) == 2 * base
+    assert health._cooldown(threshold + 2) == 4 * base
+    assert health._cooldown(threshold + 50) == timedelta(hours=health.CIRCUIT_MAX_COOLDOWN_HOURS)
+
+
+def test_broken_feeds_report_lists_chronic_failures_only():
+    feeds = [
+        {"title": "Broken", "url": "https://broken.example.com/feed"},
+        {"title": "Flaky", "url": "https://flaky.example.com/feed"},
+        {"title": "Fine", "url": "https://fine.example.com/feed"},
+    ]
+    for _ in range(health.CIRCUIT_CHRONIC_FAILURES):
+        health.record_failure(health.feed_key(feeds[0]["url"]), "HTTP 404")
+    for _ in range(health.CIRCUIT_CHRONIC_FAILURES - 1):
+        health.record_failure(health.feed_key(feeds[1]["url"]), "HTTP 500")
+    health.record_success(health.feed_key(feeds[2]["url"]))
+
+    report = health.broken_feeds_report(feeds)
+    assert [b["title"] for b in report] == ["Broken"]
+    assert report[0]["consecutive_failures"] == health.CIRCUIT_CHRONIC_FAILURES
+    assert report[0]["last_error"] == "HTTP 404"
@@ -0,0 +1,75 @@
+"""Each CLI subcommand should only import, and pay the import time of, the dependencies of its own stage."""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from reading_recs.main import STAGE_MODULES
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY = {"openai", "feedparser", "bs4", "httpx", "numpy", "pyarrow"}
+
+# Heavy packages a stage must not pull in; everything else in HEAVY it may need
+FORBIDDEN = {
+    "sync-feedback": {"numpy", "feedparser", "bs4", "openai", "pyarrow"},
+    "fetch": {"numpy", "openai", "pyarrow"},
+    "enrich": {"numpy", "feedparser", "bs4", "openai", "pyarrow"},
+    "score": {"feedparser", "bs4", "httpx", "openai", "pyarrow"},
+    "send": {"numpy", "feedparser", "bs4", "openai", "pyarrow"},
+}
+
+# Generous bound on a stage's cumulative import time, to catch a heavy import creeping back in
+STAGE_IMPORT_BUDGET_MS = 1500
+
+
+def _import_times(*modules: str) -> dict[str, int]:
+    """Cumulative import time in microseconds per module, as reported by `python -X importtime`.
+
+    Uses import statements: importlib.import_module bypasses -X importtime for the module itself.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "\n".join(f"import {m}" for m in modules)],
+        cwd=ROOT,
+        env={**os.environ, "OPENAI_API_KEY": "test"},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def _packages(times: dict[str, int]) -> set[str]:
+    return {name.split(".")[0] for name in times}
+
+
+def test_cli_startup_skips_heavy_imports():
+    # What __main__ imports before it knows the subcommand
+    times = _import_times("reading_recs.db", "reading_recs.main", "reading_recs.profiles")
+    assert not _packages(times) & HEAVY
+
+
+@pytest.mark.parametrize("command", sorted(FORBIDDEN))
+def test_stage_imports_only_its_dependencies(command):
+    assert set(FORBIDDEN) == set(STAGE_MODULES)
+    times = _import_times("reading_recs.main", *STAGE_MODULES[command])
+    assert set(STAGE_MODULES[command]) <= times.keys()
+    assert not _packages(times) & FORBIDDEN[command]
+
+    total_ms = sum(us for name, us in times.items() if name in {"reading_recs.main", *STAGE_MODULES[command]}) / 1000
+    assert total_ms < STAGE_IMPORT_BUDGET_MS, f"{command} imports took {total_ms:.0f} ms"
+
+
+def test_fetch_stage_modules_skip_openai():
+    imported = _packages(_import_times("reading_recs.fetch", "reading_recs.popularity"))
+    assert "openai" not in imported
+    assert "feedparser" in imported
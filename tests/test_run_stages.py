@@ -0,0 +1,41 @@
+"""Single-stage commands only continue a run whose earlier stages are done."""
+import pytest
+
+from reading_recs import db, main
+
+
+def test_no_run(tmp_db):
+    with pytest.raises(SystemExit, match="No run found"):
+        main.run_ready_for("enrich")
+
+
+@pytest.mark.parametrize("done, stage, ok", [
+    ("fetch", "enrich", True),
+    ("fetch", "score", False),
+    ("fetch", "send", False),
+    ("enrich", "score", True),
+    ("enrich", "send", False),
+    ("score", "send", True),
+    ("score", "enrich", True),  # re-running an earlier stage is allowed
+])
+def test_stage_requires_previous_stage(tmp_db, done, stage, ok):
+    run_id = db.start_run()
+    db.set_run_stage(run_id, done)
+    if ok:
+        assert main.run_ready_for(stage) == run_id
+    else:
+        with pytest.raises(SystemExit, match="has not completed"):
+            main.run_ready_for(stage)
+
+
+def test_run_without_fetch_is_not_ready(tmp_db):
+    db.start_run()
+    with pytest.raises(SystemExit, match="last completed: none"):
+        main.run_ready_for("enrich")
+
+
+def test_finished_run_is_not_ready(tmp_db):
+    run_id = db.start_run()
+    db.set_run_stage(run_id, "send", finished=True)
+    with pytest.raises(SystemExit, match="already finished"):
+        main.run_ready_for("send")
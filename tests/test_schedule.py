@@ -0,0 +1,53 @@
+"""Adaptive feed polling: interval estimates and which feeds are due."""
+from datetime import datetime, timedelta, timezone
+
+from reading_recs import db, schedule
+
+NOW = datetime(2026, 10, 1, 12, tzinfo=timezone.utc)
+FEEDS = [{"title": name, "url": f"https://{name}.example.com/feed"} for name in ("daily", "weekly", "new")]
+
+
+def _every(hours: float, count: int = 10) -> list[datetime]:
+    return [NOW - timedelta(hours=hours * i) for i in range(count)]
+
+
+def test_interval_is_half_the_median_gap():
+    assert schedule.estimate_interval_hours(_every(48)) == 24
+
+
+def test_interval_is_clamped():
+    assert schedule.estimate_interval_hours(_every(1)) == schedule.SCHEDULE_MIN_INTERVAL_HOURS
+    assert schedule.estimate_interval_hours(_every(24 * 30)) == schedule.SCHEDULE_MAX_INTERVAL_HOURS
+
+
+def test_interval_ignores_order_and_duplicate_timestamps():
+    published = _every(48, 5) + _every(48, 5)
+    assert schedule.estimate_interval_hours(list(reversed(published))) == 24
+
+
+def test_feeds_without_enough_dates_poll_every_run():
+    assert schedule.estimate_interval_hours([]) == schedule.SCHEDULE_MIN_INTERVAL_HOURS
+    assert schedule.estimate_interval_hours([NOW]) == schedule.SCHEDULE_MIN_INTERVAL_HOURS
+    assert schedule.estimate_interval_hours([NOW, NOW]) == schedule.SCHEDULE_MIN_INTERVAL_HOURS
+
+
+def test_due_feeds_follow_recorded_polls(tmp_db):
+    assert schedule.due_feeds(FEEDS) == FEEDS  # never polled
+
+    schedule.record_poll(FEEDS[0]["url"], _every(1))  # frequent posts: due again after the minimum interval
+    schedule.record_poll(FEEDS[1]["url"], _every(24 * 7))  # weekly posts: wait the maximum interval
+    assert schedule.due_feeds(FEEDS) == [FEEDS[2]]
+    assert schedule.due_feeds(FEEDS, force_all=True) == FEEDS
+
+    # Make the first feed's next poll time pass
+    past = (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()
+    db.save_feed_schedule(FEEDS[0]["url"], past, schedule.SCHEDULE_MIN_INTERVAL_HOURS, past)
+    assert schedule.due_feeds(FEEDS) == [FEEDS[0], FEEDS[2]]
+
+
+def test_record_poll_stores_the_next_poll_time(tmp_db):
+    before = datetime.now(timezone.utc)
+    schedule.record_poll(FEEDS[1]["url"], _every(24 * 7))
+    next_poll = datetime.fromisoformat(db.get_feed_schedule()[FEEDS[1]["url"]])
+    assert next_poll - before >= timedelta(hours=schedule.SCHEDULE_MAX_INTERVAL_HOURS)
+    assert next_poll - before < timedelta(hours=schedule.SCHEDULE_MAX_INTERVAL_HOURS, minutes=1)
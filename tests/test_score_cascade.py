@@ -0,0 +1,72 @@
+"""LLM cascade: a per-run budget that survives resumes, and an early stop judged on re-ranked scores."""
+import pytest
+
+from reading_recs import db, score
+from reading_recs.models import Article, Profile, ScoredArticle
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Stand-in for score_article that spends one call and 100 tokens per article."""
+    calls = []
+
+    def score_article(text, title, *args):
+        score._usage["calls"] += 1
+        score._usage["tokens"] += 100
+        calls.append(title)
+        return {"score": 5, "summary": title}
+
+    monkeypatch.setattr(score, "score_article", score_article)
+    monkeypatch.setattr(score, "LLM_CALL_BUDGET", 5)
+    monkeypatch.setattr(score, "CASCADE_TARGET_ARTICLES", 100)
+    monkeypatch.setattr(score, "SHADOW_SAMPLE_RATE", 0)
+    return calls
+
+
+def test_resumed_scoring_keeps_the_run_budget(tmp_db, llm):
+    run_id = db.start_run()
+    articles = [Article(url=f"https://example.com/{i}", title=f"Article {i}", source="Example", text="text") for i in range(10)]
+    db.save_run_articles(run_id, articles)
+
+    def crash_after_three(sa):
+        db.save_run_score(run_id, sa, score.llm_metrics())
+        if len(llm) == 3:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        score.score_candidates([ScoredArticle(a) for a in articles], on_scored=crash_after_three)
+    assert db.get_run_metrics(run_id)["llm_calls"] == 3
+    assert db.get_run_metrics(run_id)["llm_tokens"] == 300
+
+    rows = db.load_run_articles(run_id)
+    candidates = [ScoredArticle(r["article"], r["llm_score"], r["summary"]) for r in rows]
+    scored_urls = {r["article"].url for r in rows if r["scored"]}
+    score.score_candidates(
+        candidates, scored_urls=scored_urls,
+        on_scored=lambda sa: db.save_run_score(run_id, sa, score.llm_metrics()),
+        spent=db.get_run_metrics(run_id),
+    )
+    assert len(llm) == 5  # only the 2 calls left in the budget
+    assert score.llm_metrics()["llm_calls"] == 5
+    assert db.get_run_metrics(run_id)["llm_tokens"] == 500
+    assert sum(sa.llm_score > 0 for sa in candidates) == 5
+
+
+def test_early_stop_counts_scores_after_rerank_penalties(tmp_db, llm, monkeypatch):
+    monkeypatch.setattr(score, "LLM_CALL_BUDGET", 100)
+    monkeypatch.setattr(score, "CASCADE_TARGET_ARTICLES", 2)
+    monkeypatch.setattr(score, "score_article", lambda *args: {"score": 9, "summary": ""})
+    reader = Profile("alice", "alice@example.com", favorites_path=None, local_rerank=False)
+    articles = [Article(url=f"https://example.com/{i}", title=f"Article {i}", source=f"Source {i % 2}", text="text")
+                for i in range(6)]
+
+    candidates = [ScoredArticle(a) for a in articles]
+    score.score_candidates(candidates, readers=[reader])
+    assert sum(sa.llm_score > 0 for sa in candidates) == 2
+
+    # Source 0 was recommended to alice often lately; its 9s fall below threshold + margin after re-rank
+    db.save_recommendations("alice", [ScoredArticle(Article(f"https://old.example.com/{i}", "Old", "Source 0", ""))
+                                      for i in range(10)])
+    candidates = [ScoredArticle(a) for a in articles]
+    score.score_candidates(candidates, readers=[reader])
+    assert sum(sa.llm_score > 0 for sa in candidates) == 4
@@ -0,0 +1,73 @@
+"""The send stage delivers each reader's digest at most once per run, and records what was sent."""
+import pytest
+
+from reading_recs import db, email_digest, feedback, main
+from reading_recs.models import Article, Profile, ScoredArticle
+
+PROFILES = [Profile(name, f"{name}@example.com", favorites_path=None) for name in ("alice", "bob")]
+
+
+@pytest.fixture
+def scored_run(tmp_db):
+    run_id = db.start_run()
+    articles = [Article(url=f"https://example.com/{i}", title=f"Article {i}", source="Example", text="text") for i in range(4)]
+    db.save_run_articles(run_id, articles)
+    db.save_run_selections(run_id, {
+        "alice": [ScoredArticle(articles[0], 8.0, "a"), ScoredArticle(articles[1], 7.0, "b")],
+        "bob": [ScoredArticle(articles[2], 9.0, "c")],
+    })
+    db.set_run_stage(run_id, "score")
+    return run_id
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    sent, pushed = [], []
+    monkeypatch.setattr(feedback, "push_digest_to_kv", lambda digest_id, selected, profile: pushed.append(profile) or True)
+    monkeypatch.setattr(email_digest, "build_and_send", lambda selected, url, to: sent.append(to))
+    return sent, pushed
+
+
+def test_resumed_send_skips_readers_already_emailed(scored_run, outbox, monkeypatch):
+    sent, pushed = outbox
+
+    def fail_for_bob(selected, url, to):
+        if to.startswith("bob"):
+            raise ConnectionError("smtp down")
+        sent.append(to)
+
+    monkeypatch.setattr(email_digest, "build_and_send", fail_for_bob)
+    with pytest.raises(ConnectionError):
+        main.send_stage(scored_run, PROFILES)
+    assert sent == ["alice@example.com"]
+    assert db.get_previously_recommended("alice") == {"https://example.com/0", "https://example.com/1"}
+    assert db.get_previously_recommended("bob") == set()
+    assert db.get_latest_run()[2] is False
+
+    monkeypatch.setattr(email_digest, "build_and_send", lambda selected, url, to: sent.append(to))
+    main.send_stage(scored_run, PROFILES)
+    assert sent == ["alice@example.com", "bob@example.com"]
+    assert pushed == ["alice", "bob"]  # bob's digest was pushed before the failure and not again
+    assert db.get_previously_recommended("bob") == {"https://example.com/2"}
+    assert db.get_latest_run()[2] is True
+
+
+def test_send_rerun_before_finish_sends_nothing_again(scored_run, outbox, monkeypatch):
+    sent, pushed = outbox
+    set_run_stage = db.set_run_stage
+
+    def crash(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    # Every digest goes out, then the process dies before the run is marked finished
+    monkeypatch.setattr(db, "set_run_stage", crash)
+    with pytest.raises(KeyboardInterrupt):
+        main.send_stage(scored_run, PROFILES)
+    digest_ids = {p.name: db.get_delivery(scored_run, p.name)["digest_id"] for p in PROFILES}
+
+    monkeypatch.setattr(db, "set_run_stage", set_run_stage)
+    main.send_stage(scored_run, PROFILES)
+    assert sent == ["alice@example.com", "bob@example.com"]
+    assert pushed == ["alice", "bob"]
+    assert {p.name: db.get_delivery(scored_run, p.name)["digest_id"] for p in PROFILES} == digest_ids
+    assert db.get_latest_run()[2] is True
@@ -0,0 +1,79 @@
+"""The shared HTTP client resolves hosts through its DNS cache and reuses connections."""
+import http.server
+import socket
+import sys
+import threading
+
+import pytest
+
+from reading_recs import transport
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+
+
+@pytest.fixture
+def fresh_transport(monkeypatch):
+    monkeypatch.setattr(transport, "_client", None)
+    monkeypatch.setattr(transport, "_dns_cache", {})
+    monkeypatch.setattr(transport, "_stats", {"requests": 0, "connections": 0})
+    yield
+    if transport._client is not None:
+        transport._client.close()
+
+
+def test_requests_go_through_the_dns_cache(server, fresh_transport, monkeypatch):
+    lookups = []
+    getaddrinfo = socket.getaddrinfo
+    monkeypatch.setattr(socket, "getaddrinfo", lambda host, *args, **kwargs: lookups.append(host) or getaddrinfo(host, *args, **kwargs))
+
+    for _ in range(3):
+        assert transport.get(f"http://localhost:{server}/", "page").text == "ok"
+    assert lookups.count("localhost") == 1  # the backend then connects to the cached address
+    assert ("localhost", server) in transport._dns_cache
+    assert transport._stats == {"requests": 3, "connections": 1}
+
+
+def test_resolve_is_safe_across_threads(fresh_transport, monkeypatch):
+    # Every entry expires at once, so each lookup prunes while other threads insert
+    monkeypatch.setattr(transport, "DNS_CACHE_TTL", 0)
+    monkeypatch.setattr(socket, "getaddrinfo", lambda host, port, **kwargs: [(None, None, None, "", ("10.0.0.1", port))])
+    errors = []
+
+    def resolve_many(worker: int):
+        try:
+            for i in range(3000):
+                assert transport._resolve(f"host-{worker}-{i}", 443) == ["10.0.0.1"]
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=resolve_many, args=(w,)) for w in range(8)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads often enough to interleave with the pruning
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
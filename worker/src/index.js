@@ -89,7 +89,10 @@ async function handlePostFeedback(env, request, digestId, urlHash) {
     source: body.source || "",
     thumbs_up: body.thumbs_up,
     digest_date: body.digest_date || "",
-  }));
+  }), {
+    // Exposed in key listings so the sync job can spot changed votes without reading every value
+    metadata: { thumbs_up: body.thumbs_up },
+  });
 
   return new Response(JSON.stringify({ ok: true }), {
     headers: { "Content-Type": "application/json" },